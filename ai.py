@@ -1,6 +1,10 @@
 import os
 import re
-from groq import Groq
+import threading
+import time
+from difflib import get_close_matches
+from groq_client import APIKeyError, chat_completion, chat_completion_stream
+from answer_cache import answer_cache
 
 SYSTEM_PROMPT = """
 You are an Islamic educational assistant for a school Rohis organization.
@@ -32,48 +36,153 @@ ROUTE_MAP = {
 NAV_REGEX = re.compile(r"^NAVIGATE\s*:\s*(\w+)$", re.IGNORECASE)
 
 
-class APIKeyError(Exception):
-    """Raised when API key is missing or invalid"""
-    pass
+NAV_PREFIX = "NAVIGATE"
+
+# Local intent router: answers "go to X" style messages without calling the model.
+# Words that signal the user wants to move somewhere (English + Indonesian)
+NAV_VERBS = {
+    "go", "goto", "open", "take", "show", "navigate", "bring", "visit",
+    "buka", "bukain", "pergi", "tampilkan", "lihat", "menuju", "pindah", "antar",
+}
+
+# Anything that reads as a question goes to the model, even if it names a page
+QUESTION_WORDS = {
+    "apa", "apakah", "kenapa", "mengapa", "bagaimana", "gimana", "kapan", "siapa",
+    "berapa", "dimana", "how", "why", "what", "when", "who", "where", "which",
+}
+
+# Allowed between the verb and the page ("go to the attendance page")
+CONNECTORS = {"to", "me", "the", "my", "ke", "halaman", "page", "menu"}
+
+# Allowed around the command ("tolong buka absensi dong", "can you open members please")
+FILLERS = CONNECTORS | {
+    "please", "pls", "tolong", "coba", "dong", "ya", "yuk", "aja", "deh", "now", "sekarang",
+    "can", "could", "you", "bisa", "mau", "saya", "aku", "i", "want", "tab", "screen",
+}
+
+# Keywords per ROUTE_MAP page, single words get typo-tolerant matching
+PAGE_KEYWORDS = {
+    "dashboard": ["dashboard", "dasbor", "home", "beranda", "homepage", "halaman utama", "main page"],
+    "attendance": ["attendance", "absen", "absensi", "kehadiran", "presensi"],
+    "members": ["members", "member", "anggota", "member list", "daftar anggota"],
+    "login": ["login", "log in", "sign in", "masuk akun"],
+}
+
+_SINGLE_KEYWORDS = {
+    keyword: page
+    for page, keywords in PAGE_KEYWORDS.items()
+    for keyword in keywords if " " not in keyword
+}
+_PHRASE_KEYWORDS = [
+    (keyword, page)
+    for page, keywords in PAGE_KEYWORDS.items()
+    for keyword in keywords if " " in keyword
+]
+
+# Longer messages are real questions ("why is attendance important?"), leave them to the model
+MAX_ROUTER_WORDS = 8
+FUZZY_CUTOFF = 0.85
+
+_router_stats = {"hits": 0, "misses": 0}
+_router_lock = threading.Lock()
+
+
+def _normalize(text: str) -> list:
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
 
 
-def get_groq_client():
+def _page_at(words: list, i: int):
     """
-    Get Groq client with proper error handling.
-    
-    Raises:
-        APIKeyError: If GROQ_API_KEY is not set in environment
+    Page keyword starting at words[i], phrases first, then single words
+    with typo tolerance ("attendence").
+
+    Returns:
+        (page, index after the keyword) or None
     """
-    api_key = os.environ.get("GROQ_API_KEY")
-    
-    if not api_key:
-        raise APIKeyError(
-            "GROQ_API_KEY environment variable is not set. "
-            "Please set it in your .env file or environment variables."
-        )
-    
-    if not api_key.strip():
-        raise APIKeyError(
-            "GROQ_API_KEY is empty. Please provide a valid API key."
-        )
-    
-    try:
-        return Groq(api_key=api_key)
-    except Exception as e:
-        raise APIKeyError(f"Failed to initialize Groq client: {str(e)}")
+    for phrase, page in _PHRASE_KEYWORDS:
+        phrase_words = phrase.split()
+        if words[i:i + len(phrase_words)] == phrase_words:
+            return page, i + len(phrase_words)
+    if i >= len(words):
+        return None
+    word = words[i]
+    if word in _SINGLE_KEYWORDS:
+        return _SINGLE_KEYWORDS[word], i + 1
+    if len(word) >= 4:
+        close = get_close_matches(word, _SINGLE_KEYWORDS.keys(), n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return _SINGLE_KEYWORDS[close[0]], i + 1
+    return None
 
 
-def call_chatbot_groq(message: str) -> dict:
+def _only_fillers(words: list) -> bool:
+    return all(word in FILLERS for word in words)
+
+
+def match_navigation_intent(message: str):
     """
-    Call Groq API for chatbot response.
-    
+    Match simple navigation requests locally. Only two shapes are routed:
+    a command with the verb right before the page ("buka absensi",
+    "go to the members page") or the page name on its own ("dashboard"),
+    each with optional polite filler words. Questions never match.
+
     Args:
         message: User's input message
-        
+
     Returns:
-        dict with 'action' and either 'message' or 'redirect'
+        Route from ROUTE_MAP, or None if the message should go to the model
+    """
+    words = _normalize(message)
+    route = None
+
+    if 0 < len(words) <= MAX_ROUTER_WORDS and "?" not in message \
+            and not any(word in QUESTION_WORDS for word in words):
+        start = 0
+        while start < len(words) and words[start] in FILLERS:
+            start += 1
+
+        if start < len(words) and words[start] in NAV_VERBS:
+            start += 1
+            while start < len(words) and words[start] in CONNECTORS:
+                start += 1
+
+        match = _page_at(words, start) if start < len(words) else None
+        if match and _only_fillers(words[match[1]:]):
+            route = ROUTE_MAP[match[0]]
+
+    with _router_lock:
+        _router_stats["hits" if route else "misses"] += 1
+    return route
+
+
+def get_router_stats() -> dict:
+    """
+    Intent router counters for this worker process.
+
+    Returns:
+        dict with hits (LLM calls saved), misses and hit_rate
+    """
+    with _router_lock:
+        hits = _router_stats["hits"]
+        misses = _router_stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0
+    }
+
+UNAVAILABLE_MESSAGE = "Chat service is currently unavailable. Please contact the administrator."
+ERROR_MESSAGE = "I'm sorry, I can't respond right now. Please try again later."
+
+
+def validate_message(message: str):
+    """
+    Check the user's message before spending a model call on it.
+
+    Returns:
+        Reply dict to send back if the message is rejected, otherwise None
     """
-    # Validate input
     if not message or not message.strip():
         return {
             "action": "chat",
@@ -85,47 +194,99 @@ def call_chatbot_groq(message: str) -> dict:
             "action": "chat",
             "message": "Please ask a shorter question (max 500 characters)."
         }
+    return None
+
+
+def build_messages(message: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT.strip()},
+        {"role": "user", "content": message.strip()}
+    ]
+
 
+def build_reply(content: str) -> dict:
+    """
+    Turn model output into a reply, resolving NAVIGATE commands to routes.
+
+    Returns:
+        dict with 'action' and either 'message' or 'redirect'
+    """
+    # Check for navigation command
+    match = NAV_REGEX.match(content)
+    if match:
+        page = match.group(1).lower()
+        route = ROUTE_MAP.get(page)
+        if route:
+            return {
+                "action": "navigate",
+                "redirect": route
+            }
+
+    # Return normal chat response
+    return {
+        "action": "chat",
+        "message": content
+    }
+
+
+def cached_reply(message: str):
+    """Cached reply for a question, or None. Cache problems never break the chat."""
     try:
-        # Get Groq client
-        client = get_groq_client()
+        return answer_cache.get(message)
+    except Exception as e:
+        print(f"Answer cache error: {type(e).__name__}: {e}")
+        return None
+
+
+def store_reply(message: str, reply: dict, latency: float):
+    try:
+        answer_cache.put(message, reply, latency)
+    except Exception as e:
+        print(f"Answer cache error: {type(e).__name__}: {e}")
+
+
+def call_chatbot_groq(message: str) -> dict:
+    """
+    Call Groq API for chatbot response.
+    
+    Args:
+        message: User's input message
         
-        # Make API call
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT.strip()},
-                {"role": "user", "content": message.strip()}
-            ],
-            temperature=0.3,
-            max_tokens=180,
-        )
+    Returns:
+        dict with 'action' and either 'message' or 'redirect'
+    """
+    # Validate input
+    rejected = validate_message(message)
+    if rejected:
+        return rejected
 
-        content = completion.choices[0].message.content.strip()
+    route = match_navigation_intent(message)
+    if route:
+        return {"action": "navigate", "redirect": route}
 
-        # Check for navigation command
-        match = NAV_REGEX.match(content)
-        if match:
-            page = match.group(1).lower()
-            route = ROUTE_MAP.get(page)
-            if route:
-                return {
-                    "action": "navigate",
-                    "redirect": route
-                }
+    cached = cached_reply(message)
+    if cached:
+        return cached
 
-        # Return normal chat response
-        return {
-            "action": "chat",
-            "message": content
-        }
+    try:
+        # Make API call (shared client, retries + circuit breaker)
+        started = time.monotonic()
+        content = chat_completion(
+            messages=build_messages(message),
+            temperature=0.3,
+            max_tokens=180,
+        )
+        reply = build_reply(content)
+        if content:
+            store_reply(message, reply, time.monotonic() - started)
+        return reply
 
     except APIKeyError as e:
         # API key configuration error
         print(f"API Key Error: {e}")
         return {
             "action": "chat",
-            "message": "Chat service is currently unavailable. Please contact the administrator."
+            "message": UNAVAILABLE_MESSAGE
         }
     
     except Exception as e:
@@ -133,5 +294,77 @@ def call_chatbot_groq(message: str) -> dict:
         print(f"Groq API error: {type(e).__name__}: {e}")
         return {
             "action": "chat",
-            "message": "I'm sorry, I can't respond right now. Please try again later."
-        }
\ No newline at end of file
+            "message": ERROR_MESSAGE
+        }
+
+
+def _could_be_navigation(text: str) -> bool:
+    """True while the streamed prefix may still turn into a NAVIGATE command"""
+    head = text.lstrip().upper()
+    return head.startswith(NAV_PREFIX) or NAV_PREFIX.startswith(head)
+
+
+def stream_chatbot_groq(message: str):
+    """
+    Stream a chatbot response token by token.
+
+    Output that could still be a NAVIGATE command is held back until it is
+    clearly not one, so users never see a half-printed command.
+
+    Args:
+        message: User's input message
+
+    Yields:
+        ("token", text) tuples while streaming, then one ("done", reply_dict)
+        where reply_dict has the same shape as call_chatbot_groq's result
+    """
+    rejected = validate_message(message)
+    if rejected:
+        yield "done", rejected
+        return
+
+    route = match_navigation_intent(message)
+    if route:
+        yield "done", {"action": "navigate", "redirect": route}
+        return
+
+    cached = cached_reply(message)
+    if cached:
+        if cached.get("action") == "chat":
+            yield "token", cached.get("message", "")
+        yield "done", cached
+        return
+
+    content = ""
+    sent = 0
+    complete = False
+    started = time.monotonic()
+    try:
+        for delta in chat_completion_stream(
+            messages=build_messages(message),
+            temperature=0.3,
+            max_tokens=180,
+        ):
+            content += delta
+            if sent == 0 and _could_be_navigation(content):
+                continue
+            yield "token", content[sent:]
+            sent = len(content)
+        complete = True
+
+    except APIKeyError as e:
+        print(f"API Key Error: {e}")
+        if not sent:
+            yield "done", {"action": "chat", "message": UNAVAILABLE_MESSAGE}
+            return
+
+    except Exception as e:
+        print(f"Groq API error: {type(e).__name__}: {e}")
+        if not sent:
+            yield "done", {"action": "chat", "message": ERROR_MESSAGE}
+            return
+
+    reply = build_reply(content.strip())
+    if complete and content.strip():
+        store_reply(message, reply, time.monotonic() - started)
+    yield "done", reply
@@ -0,0 +1,332 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# SQLite file shared by every gunicorn worker on the machine
+CACHE_PATH = os.environ.get("CHAT_CACHE_PATH", os.path.join("instance", "chat_cache.db"))
+TTL_SECONDS = int(os.environ.get("CHAT_CACHE_TTL", 7 * 24 * 60 * 60))
+MAX_ENTRIES = int(os.environ.get("CHAT_CACHE_MAX_ENTRIES", 1000))
+
+# Near-duplicate matching ("tolong jelaskan apa itu wudu" vs "apa itu wudu ya") via
+# MinHash over word tokens + LSH bands. Opt-in: a wrong hit hands out the answer to
+# a different question
+NEAR_DUPLICATES = os.environ.get("CHAT_CACHE_NEAR_DUPLICATES", "0") == "1"
+SIMILARITY_THRESHOLD = 0.8
+NUM_HASHES = 32
+BANDS = 8
+ROWS_PER_BAND = NUM_HASHES // BANDS
+
+# Politeness words that don't change the question
+FILLER_WORDS = {"ya", "dong", "sih", "kak", "tolong", "please", "pls", "deh", "nih", "min"}
+
+# Questions differing in any of these are different questions, however similar
+NEGATIONS = {
+    "tidak", "tak", "bukan", "jangan", "belum", "tanpa", "gak", "ga", "nggak", "enggak", "ngga",
+    "not", "no", "never", "nor", "without", "cannot", "cant", "dont", "doesnt", "didnt",
+    "isnt", "arent", "wasnt", "werent", "wont", "wouldnt", "shouldnt", "couldnt", "mustnt",
+    "hasnt", "havent", "hadnt", "neednt",
+}
+NUMBER = re.compile(r"\d+")
+
+# Stats and last_used are written in one transaction at most this often
+FLUSH_SECONDS = 10
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# fixed coefficients so every worker computes the same signatures
+_HASH_PARAMS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME or 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_HASHES)
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    reply TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    latency REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_answers_last_used ON answers (last_used);
+CREATE TABLE IF NOT EXISTS answer_bands (
+    band TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (band, key)
+);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question so trivial differences share one cache entry.
+    Lowercases, drops punctuation and collapses whitespace. Apostrophes are
+    removed rather than spaced out, so "can't" stays one word ("cant") and
+    the negation guard can see it.
+    """
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = re.sub(r"['\u2019\u02bc`]", "", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def _tokens(normalized: str) -> set:
+    return {word for word in normalized.split() if word not in FILLER_WORDS} or {normalized}
+
+
+def _guard_words(normalized: str) -> tuple:
+    """Negations and numbers, which must match exactly for a near-duplicate"""
+    words = normalized.split()
+    return (
+        frozenset(word for word in words if word in NEGATIONS),
+        frozenset(NUMBER.findall(normalized)),
+    )
+
+
+def minhash_signature(normalized: str) -> list:
+    """
+    MinHash of the question's word tokens, used to estimate Jaccard similarity.
+
+    Returns:
+        List of NUM_HASHES integers
+    """
+    values = [
+        int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        for token in _tokens(normalized)
+    ]
+    return [min((a * v + b) % _MERSENNE_PRIME for v in values) for a, b in _HASH_PARAMS]
+
+
+def _bands(signature: list) -> list:
+    return [
+        f"{i}:" + ",".join(str(v) for v in signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND])
+        for i in range(BANDS)
+    ]
+
+
+def _similarity(sig_a: list, sig_b: list) -> float:
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class AnswerCache:
+    """
+    Chatbot answer cache in a local SQLite file.
+    Safe to share between processes; each thread gets its own connection.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES,
+                 near_duplicates=NEAR_DUPLICATES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.near_duplicates = near_duplicates
+        self._local = threading.local()
+        # stat increments and last_used touches waiting for the next flush
+        self._pending_stats = {}
+        self._pending_touches = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # WAL lets readers in other workers carry on while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _bump(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO cache_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def _record(self, touched_key=None, **stats):
+        """Queue stat increments / a last_used touch, nothing is written here"""
+        with self._pending_lock:
+            for name, amount in stats.items():
+                self._pending_stats[name] = self._pending_stats.get(name, 0) + amount
+            if touched_key is not None:
+                self._pending_touches[touched_key] = time.time()
+
+    def _take_pending(self):
+        with self._pending_lock:
+            stats, touches = self._pending_stats, self._pending_touches
+            self._pending_stats, self._pending_touches = {}, {}
+            self._last_flush = time.monotonic()
+        return stats, touches
+
+    def _write_pending(self, conn, stats, touches):
+        for name, amount in stats.items():
+            self._bump(conn, name, amount)
+        conn.executemany(
+            "UPDATE answers SET last_used = MAX(last_used, ?) WHERE key = ?",
+            [(used, key) for key, used in touches.items()]
+        )
+
+    def flush(self, force: bool = False):
+        """Write queued stats and last_used touches in a single transaction"""
+        if not force and time.monotonic() - self._last_flush < FLUSH_SECONDS:
+            return
+        stats, touches = self._take_pending()
+        if not stats and not touches:
+            return
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._write_pending(conn, stats, touches)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            # counters are best effort, never fail a chat reply over them
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Answer cache stats flush skipped: {e}")
+
+    def get(self, question: str):
+        """
+        Look up a cached reply for a question.
+
+        Returns:
+            Reply dict, or None on a miss
+        """
+        conn = self._conn()
+        normalized = normalize_question(question)
+        now = time.time()
+
+        row = conn.execute(
+            "SELECT key, reply, latency, created_at FROM answers WHERE key = ?",
+            (normalized,)
+        ).fetchone()
+
+        near_hit = False
+        if row is None and self.near_duplicates:
+            row = self._find_near_duplicate(conn, normalized)
+            near_hit = row is not None
+
+        if row is not None and now - row[3] > self.ttl:
+            self._delete(conn, row[0])
+            row = None
+
+        if row is None:
+            self._record(lookups=1)
+            self.flush()
+            return None
+
+        key, reply, latency, created_at = row
+        self._record(key, lookups=1, hits=1, near_hits=int(near_hit), saved_seconds=latency)
+        self.flush()
+        return json.loads(reply)
+
+    def _find_near_duplicate(self, conn, normalized):
+        signature = minhash_signature(normalized)
+        bands = _bands(signature)
+        placeholders = ",".join("?" * len(bands))
+        candidates = conn.execute(
+            f"SELECT DISTINCT a.key, a.reply, a.latency, a.created_at, a.signature "
+            f"FROM answer_bands b JOIN answers a ON a.key = b.key "
+            f"WHERE b.band IN ({placeholders})",
+            bands
+        ).fetchall()
+
+        guard = _guard_words(normalized)
+        best, best_score = None, SIMILARITY_THRESHOLD
+        for key, reply, latency, created_at, stored in candidates:
+            # "boleh makan saat puasa" vs "tidak boleh ...", "ramadan 2025" vs "2026"
+            if _guard_words(key) != guard:
+                continue
+            score = _similarity(signature, json.loads(stored))
+            if score >= best_score:
+                best, best_score = (key, reply, latency, created_at), score
+        return best
+
+    def put(self, question: str, reply: dict, latency: float = 0.0):
+        """
+        Store a reply, evicting the least recently used entries past MAX_ENTRIES.
+
+        Args:
+            question: The user's question
+            reply: Reply dict as returned to the client
+            latency: Seconds the model took, counted as saved on later hits
+        """
+        conn = self._conn()
+        normalized = normalize_question(question)
+        signature = minhash_signature(normalized)
+        now = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, question, reply, signature, latency, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalized, question, json.dumps(reply), json.dumps(signature), latency, now, now)
+            )
+            conn.execute("DELETE FROM answer_bands WHERE key = ?", (normalized,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO answer_bands (band, key) VALUES (?, ?)",
+                [(band, normalized) for band in _bands(signature)]
+            )
+
+            overflow = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                stale = [k for (k,) in conn.execute(
+                    "SELECT key FROM answers ORDER BY last_used ASC LIMIT ?", (overflow,)
+                )]
+                for key in stale:
+                    self._delete(conn, key)
+                self._bump(conn, "evictions", len(stale))
+            # already holding the write lock, take the queued stats along
+            self._write_pending(conn, *self._take_pending())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _delete(self, conn, key):
+        conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+        conn.execute("DELETE FROM answer_bands WHERE key = ?", (key,))
+
+    def stats(self) -> dict:
+        """
+        Cache metrics across all workers.
+
+        Returns:
+            dict with lookups, hits, near_hits, hit_ratio, saved_seconds, entries
+        """
+        self.flush(force=True)
+        conn = self._conn()
+        values = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        lookups = int(values.get("lookups", 0))
+        hits = int(values.get("hits", 0))
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "near_hits": int(values.get("near_hits", 0)),
+            "evictions": int(values.get("evictions", 0)),
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "saved_seconds": round(values.get("saved_seconds", 0.0), 2),
+            "entries": conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0],
+        }
+
+
+answer_cache = AnswerCache()
+# don't lose the last few seconds of counters on shutdown
+atexit.register(answer_cache.flush, True)
@@ -1,23 +1,39 @@
 #NEEDED LIBRARIES RAHHHHHH, kinda messy
 from utils import can_mark_attendance, is_core_user
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, Response, Blueprint
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, Response, Blueprint, stream_with_context
 from flask_sqlalchemy import SQLAlchemy 
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_bcrypt import Bcrypt
 import os
-from models import Pic, db, User, Session, Attendance, Notulensi
+from models import Pic, db, User, Session, Attendance, Notulensi, ProfilePicture, ProfilePictureVariant, AttendanceSyncKey, SessionReport, ReportJob
 from datetime import datetime, date, timezone, timedelta
-from ummalqura.hijri_date import HijriDate
+from hijri_calendar import hijri_label, holidays_between, parse_range_date, MAX_RANGE as MAX_HIJRI_RANGE
 import json
 from werkzeug.utils import secure_filename
-from ai import call_chatbot_groq
+from ai import call_chatbot_groq, stream_chatbot_groq, get_router_stats
+from answer_cache import answer_cache
 from flask_migrate import Migrate
 import csv
 from io import TextIOWrapper, StringIO, BytesIO
 from docx import Document
-from formatter import format_attendance
-from summarizer import summarize_notulensi
+from formatter import format_attendance, format_attendance_rows
+from groq_client import APIKeyError
+from summarizer import get_summary_cache_key, local_summary, plain_text_fields, FALLBACK_SUMMARY
+import summary_queue
+import report_queue
+from term_report import REPORT_FORMATS
+import query_budget
+from attendance_stats import ATTENDANCE_STATUSES, status_counts
+from attendance_export import export_rows, formatter_rows, iter_csv, write_xlsx, iter_file
+from session_ranges import sessions_between, sessions_in_month, sessions_in_term, parse_term, term_bounds, term_for
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload, defer
+from sqlalchemy import insert as sa_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from image_cache import avatar_cache, content_hash
+from functools import lru_cache
+from image_processing import make_thumbnails, pick_thumbnail_size, InvalidImageError, VARIANT_FORMATS
 #config for the pfp
 UPLOAD_FOLDER = 'static/uploads/profiles'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
@@ -32,6 +48,9 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 migrate = Migrate(app, db)
+summary_queue.init_app(app)
+report_queue.init_app(app)
+query_budget.init_app(app)
 attendance_bp = Blueprint("attendance", __name__)
 
 #manager ofc, t can see it
@@ -108,8 +127,9 @@ def profile():
 
 @app.route('/member-list')
 @login_required
+@query_budget.limit(4)
 def member_list():
-    users = User.query.all()
+    users = User.query.options(selectinload(User.pic)).all()
     return render_template('member_list.html', users=users)
 
 @app.route('/create-session', methods=['GET', 'POST'])
@@ -119,9 +139,12 @@ def create_session():
         return "Access denied"
     if request.method == 'POST':
         name = request.form['name']
-        date = request.form['date']
+        session_date = parse_range_date(request.form.get('date'))
+        if not session_date:
+            flash("Please pick a valid session date.", "danger")
+            return redirect(url_for('create_session'))
 
-        new_session = Session(name=name, date=date)
+        new_session = Session(name=name, date=session_date)
         db.session.add(new_session)
         db.session.commit()
         return redirect(url_for('dashboard_admin'))
@@ -271,6 +294,262 @@ def api_attendance_core():
         print(f"Database error: {e}")
         return jsonify({"error": "database_error", "message": str(e)}), 500
     
+MAX_BATCH_MARKS = 500
+
+def attendance_permission_error(session, attendance_type):
+    """
+    Session-level checks, run once per session in a sync request.
+
+    Returns:
+        Error code (session_locked / forbidden) or None if marking is allowed
+    """
+    if session.is_locked:
+        return "session_locked"
+    if attendance_type == "core":
+        if not is_core_user(current_user):
+            return "forbidden"
+    elif not can_mark_attendance(current_user, session.pic_id):
+        return "forbidden"
+    return None
+
+def stage_attendance_marks(session_id, attendance_type, marks):
+    """
+    Write many marks for one already-authorized session (caller commits).
+
+    Args:
+        marks: list of (user_id, status, timestamp); user_id None = unparseable
+
+    Returns:
+        List of results in the same order: created, already_marked, forbidden or invalid
+    """
+    results = ["invalid"] * len(marks)
+    wanted = {}
+    for i, (user_id, status, timestamp) in enumerate(marks):
+        if user_id is None or status not in ATTENDANCE_STATUSES:
+            continue
+        if user_id in wanted:
+            results[i] = "already_marked"
+        else:
+            wanted[user_id] = (i, status, timestamp)
+
+    if not wanted:
+        return results
+
+    users = {u.id: u for u in User.query.filter(User.id.in_(wanted.keys()))}
+    already_marked = {
+        user_id for (user_id,) in db.session.query(Attendance.user_id).filter(
+            Attendance.session_id == session_id,
+            Attendance.user_id.in_(wanted.keys())
+        )
+    }
+
+    rows = []
+    for user_id, (i, status, timestamp) in wanted.items():
+        if user_id not in users:
+            results[i] = "invalid"
+        elif attendance_type == "core" and not is_core_user(users[user_id]):
+            results[i] = "forbidden"
+        elif user_id in already_marked:
+            results[i] = "already_marked"
+        else:
+            rows.append({
+                'session_id': session_id,
+                'user_id': user_id,
+                'status': status,
+                'attendance_type': attendance_type,
+                'timestamp': timestamp
+            })
+
+    inserted = insert_attendance_rows(rows, returning=True)
+    for row in rows:
+        user_id = row['user_id']
+        # lost a race with another submission -> someone else marked it first
+        created = inserted is None or user_id in inserted
+        results[wanted[user_id][0]] = "created" if created else "already_marked"
+    return results
+
+def parse_user_id(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+def count_results(results):
+    counts = {}
+    for result in results:
+        counts[result] = counts.get(result, 0) + 1
+    return counts
+
+def parse_captured_at(value, now):
+    """Offline marks carry the time they were taken; ignore junk and future times"""
+    if not value:
+        return now
+    try:
+        captured = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return now
+    if captured.tzinfo is None or captured > now:
+        return now
+    # stored in WIB like every other attendance timestamp
+    return captured.astimezone(now.tzinfo)
+
+@app.route("/api/attendance/sync", methods=["POST"])
+@login_required
+def api_attendance_sync():
+    """
+    Apply marks captured offline. Every mark carries a client-generated
+    idempotency key; a key this member sent before returns its stored
+    result instead of being applied again, so retries are always safe.
+
+    Body: {"marks": [{"key": "...", "session_id": 1, "user_id": 2,
+                      "status": "present", "attendance_type": "regular",
+                      "captured_at": "2026-03-01T07:15:00+07:00"}, ...]}
+    Each key gets a result: created, already_marked, forbidden, session_locked or invalid.
+    """
+    data = request.get_json(silent=True) or {}
+    marks = data.get("marks")
+
+    if not isinstance(marks, list):
+        return jsonify({"error": "invalid_data", "message": "Missing required fields"}), 400
+
+    if len(marks) > MAX_BATCH_MARKS:
+        return jsonify({"error": "invalid_data", "message": f"At most {MAX_BATCH_MARKS} marks per request"}), 400
+
+    marks = [mark for mark in marks if isinstance(mark, dict) and isinstance(mark.get("key"), str)]
+    keys = list(dict.fromkeys(mark["key"] for mark in marks))
+
+    # Malformed keys still get an answer, so the client drops them from its queue
+    results = {key: "invalid" for key in keys if not 8 <= len(key) <= 64}
+    marks = [mark for mark in marks if mark["key"] not in results]
+
+    # Keys this member already applied, one query for the whole queue. Keys
+    # are scoped per member, so someone else's key is just a new mark here
+    valid_keys = [key for key in keys if key not in results]
+    if valid_keys:
+        results.update(
+            db.session.query(AttendanceSyncKey.key, AttendanceSyncKey.result)
+            .filter(AttendanceSyncKey.user_id == current_user.id, AttendanceSyncKey.key.in_(valid_keys))
+        )
+
+    wib = timezone(timedelta(hours=7))
+    now = datetime.now(wib)
+    groups = {}
+    for mark in marks:
+        if mark["key"] in results:
+            continue
+        # placeholder so a key repeated within this request is only applied once
+        results[mark["key"]] = None
+        attendance_type = mark.get("attendance_type", "regular")
+        session_id = parse_user_id(mark.get("session_id"))
+        groups.setdefault((session_id, attendance_type), []).append(mark)
+
+    new_keys = []
+    try:
+        session_ids = [sid for sid, _ in groups if sid is not None]
+        sessions = {s.id: s for s in Session.query.filter(Session.id.in_(session_ids))} if session_ids else {}
+
+        for (session_id, attendance_type), group in groups.items():
+            session = sessions.get(session_id)
+            if not session or attendance_type not in ("regular", "core"):
+                group_results = ["invalid"] * len(group)
+            else:
+                error = attendance_permission_error(session, attendance_type)
+                if error:
+                    group_results = [error] * len(group)
+                else:
+                    group_results = stage_attendance_marks(session_id, attendance_type, [
+                        (parse_user_id(mark.get("user_id")), mark.get("status"),
+                         parse_captured_at(mark.get("captured_at"), now))
+                        for mark in group
+                    ])
+
+            for mark, result in zip(group, group_results):
+                results[mark["key"]] = result
+                new_keys.append({
+                    'key': mark["key"],
+                    'user_id': current_user.id,
+                    'result': result,
+                    'created_at': datetime.utcnow()
+                })
+
+        if new_keys:
+            db.session.execute(insert_ignore_duplicates(AttendanceSyncKey, new_keys, ['user_id', 'key']))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Database error: {e}")
+        return jsonify({"error": "database_error", "message": str(e)}), 500
+
+    return jsonify({
+        "success": True,
+        "results": [{"key": key, "result": results[key]} for key in keys],
+        "counts": count_results(results.values())
+    })
+
+@app.route("/api/attendance/summary", methods=["GET"])
+@login_required
+def api_attendance_summary():
+    """
+    Per-status attendance counts, computed in the database.
+
+    Query params: session_id, user_id, attendance_type (all optional).
+    Members can only see their own counts.
+    """
+    session_id = request.args.get("session_id", type=int)
+    user_id = request.args.get("user_id", type=int)
+    attendance_type = request.args.get("attendance_type")
+
+    if current_user.role not in ['admin', 'ketua', 'pembina']:
+        if user_id not in (None, current_user.id):
+            return jsonify({"error": "forbidden", "message": "Permission denied"}), 403
+        user_id = current_user.id
+
+    if attendance_type not in (None, "regular", "core"):
+        return jsonify({"error": "invalid_data", "message": "Unknown attendance_type"}), 400
+
+    return jsonify(status_counts(session_id=session_id, user_id=user_id, attendance_type=attendance_type))
+
+@app.route("/api/sessions", methods=["GET"])
+@login_required
+def api_sessions():
+    """
+    Sessions in a date range, oldest first.
+
+    Query params (one of):
+        month=2026-03          calendar month
+        term=2025-1            school term (1 = Jul-Dec, 2 = Jan-Jun of the next year)
+        start=...&end=...      any range, end exclusive
+    Optional pic_id narrows to one PIC.
+    """
+    pic_id = request.args.get("pic_id", type=int)
+    month = request.args.get("month")
+    term = request.args.get("term")
+
+    if month:
+        month_start = parse_range_date(f"{month}-01")
+        if not month_start:
+            return jsonify({"error": "invalid_data", "message": "month must look like 2026-03"}), 400
+        sessions = sessions_in_month(month_start.year, month_start.month, pic_id=pic_id)
+    elif term:
+        parsed = parse_term(term)
+        if not parsed:
+            return jsonify({"error": "invalid_data", "message": "term must look like 2025-1"}), 400
+        sessions = sessions_in_term(*parsed, pic_id=pic_id)
+    else:
+        start = parse_range_date(request.args.get("start"))
+        end = parse_range_date(request.args.get("end"))
+        if not start or not end or end <= start:
+            return jsonify({"error": "invalid_data", "message": "Pass month, term or start/end"}), 400
+        sessions = sessions_between(start, end, pic_id=pic_id)
+
+    return jsonify([{
+        "id": s.id,
+        "name": s.name,
+        "date": s.date.isoformat(),
+        "pic_id": s.pic_id,
+        "is_locked": s.is_locked
+    } for s in sessions])
+
 @app.route("/api/session/<int:session_id>/status", methods=["GET"])
 @login_required
 def get_session_status(session_id):
@@ -289,11 +568,27 @@ def lock_session(session_id):
         return jsonify({"error": "forbidden"}), 403
 
     session = Session.query.get_or_404(session_id)
-    session.is_locked = True
+    if not session.is_locked:
+        session.is_locked = True
+        invalidate_session_report(session)
     db.session.commit()
 
     return jsonify({"locked": True})
 
+@app.route("/api/session/<int:session_id>/unlock", methods=["POST"])
+@login_required
+def unlock_session(session_id):
+    if current_user.role not in ["admin", "ketua"]:
+        return jsonify({"error": "forbidden"}), 403
+
+    session = Session.query.get_or_404(session_id)
+    if session.is_locked:
+        session.is_locked = False
+        invalidate_session_report(session)
+    db.session.commit()
+
+    return jsonify({"locked": False})
+
 @app.route('/pics', methods=['GET', 'POST'])
 @login_required
 def manage_pics():
@@ -319,16 +614,14 @@ def manage_pics():
 
     pics = Pic.query.all()
     return render_template('manage_pic.html', pics=pics)
-#DOWNLOAD ATTENDANCE RAHHHHH
-@app.route("/export/attendance/<int:session_id>")
-@login_required
-def export_attendance_csv(session_id):
-    if current_user.role not in ["admin", "ketua", "pembina"]:
-        abort(403)
+def export_filename(session, extension):
+    return f"attendance_{session.name.replace(' ', '_')}_{session.date}.{extension}"
 
-    session = Session.query.get_or_404(session_id)
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
-    records = (
+def session_report_records(session_id):
+    """Attendance rows of a session with the member fields the report prints, by name"""
+    return (
         db.session.query(
             Attendance,
             User.name,
@@ -341,9 +634,38 @@ def export_attendance_csv(session_id):
         .all()
     )
 
+def session_report_key(session, records):
+    """
+    Fingerprint of everything that ends up in a session's report: session
+    name and date plus every attendance row with its member's name, email
+    and role. Any edit to those (a renamed member, a moved session) gives a
+    new key, whether or not the session was unlocked for it.
+    """
+    inputs = [session.name, session.date.isoformat() if session.date else None]
+    for attendance, name, email, role in records:
+        inputs.append([
+            attendance.user_id, name, email, role, attendance.status,
+            attendance.timestamp.isoformat() if attendance.timestamp else None,
+            attendance.attendance_type
+        ])
+    return content_hash(json.dumps(inputs, separators=(',', ':')).encode())
+
+def build_attendance_docx(session, records=None):
+    """
+    Render the DOCX attendance report of a session.
+
+    Args:
+        records: session_report_records() rows, queried if not given
+
+    Returns:
+        Document bytes, or None if the session has no attendance yet
+    """
+    session_id = session.id
+    if records is None:
+        records = session_report_records(session_id)
+
     if not records:
-        flash("No attendance records found for this session", "warning")
-        return redirect(url_for('attendance_mark'))
+        return None
 
     wib = timezone(timedelta(hours=7))
     
@@ -353,12 +675,7 @@ def export_attendance_csv(session_id):
     doc.add_paragraph(f'Total Attendees: {len(records)}')
     doc.add_paragraph('')
     
-    summary = {
-        'present': sum(1 for a, _, _, _ in records if a.status == 'present'),
-        'absent': sum(1 for a, _, _, _ in records if a.status == 'absent'),
-        'excused': sum(1 for a, _, _, _ in records if a.status == 'excused'),
-        'late': sum(1 for a, _, _, _ in records if a.status == 'late'),
-    }
+    summary = status_counts(session_id=session_id)
     
     doc.add_heading('Summary', level=1)
     summary_table = doc.add_table(rows=5, cols=2)
@@ -401,13 +718,232 @@ def export_attendance_csv(session_id):
     
     bio = BytesIO()
     doc.save(bio)
-    bio.seek(0)
+    return bio.getvalue()
+
+def invalidate_session_report(session):
+    """
+    Start a new lock version and drop the cached report (caller commits).
+    Call on anything that changes what a session's report would contain.
+    """
+    session.lock_version = (session.lock_version or 0) + 1
+    SessionReport.query.filter_by(session_id=session.id).delete()
+
+def cached_session_report(session, records=None):
+    """
+    Report bytes and ETag for a session. The ETag is session_report_key(),
+    so it changes with any report input. Locked sessions keep their report
+    in the table and only re-render when that key moves.
+
+    Args:
+        records: session_report_records() rows, queried if not given
+
+    Returns:
+        (data, etag), or (None, None) if there is nothing to report
+    """
+    if records is None:
+        records = session_report_records(session.id)
+    if not records:
+        return None, None
+    etag = session_report_key(session, records)
+
+    if session.is_locked:
+        report = SessionReport.query.get(session.id)
+        if report and report.etag == etag:
+            return report.data, report.etag
+
+    data = build_attendance_docx(session, records)
+
+    if session.is_locked:
+        try:
+            db.session.merge(SessionReport(
+                session_id=session.id,
+                lock_version=session.lock_version,
+                etag=etag,
+                data=data
+            ))
+            db.session.commit()
+        except IntegrityError:
+            # another worker cached it first, same bytes
+            db.session.rollback()
+    return data, etag
+
+#DOWNLOAD ATTENDANCE RAHHHHH
+@app.route("/export/attendance/<int:session_id>")
+@login_required
+def export_attendance_csv(session_id):
+    if current_user.role not in ["admin", "ketua", "pembina"]:
+        abort(403)
+
+    session = Session.query.get_or_404(session_id)
+    records = session_report_records(session_id)
+
+    # conditional request against the report inputs, nothing rendered or loaded
+    if records:
+        etag = session_report_key(session, records)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+    data, etag = cached_session_report(session, records)
+    if data is None:
+        flash("No attendance records found for this session", "warning")
+        return redirect(url_for('attendance_mark'))
+
+    response = Response(
+        data,
+        mimetype=DOCX_MIMETYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename={export_filename(session, 'docx')}"
+        }
+    )
+    response.set_etag(etag)
+    # always revalidate: the ETag check is one query and catches any edit
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+@app.route("/export/attendance/<int:session_id>/csv")
+@login_required
+def export_attendance_csv_stream(session_id):
+    """Plain CSV export, streamed row by row straight from the database cursor"""
+    if current_user.role not in ["admin", "ketua", "pembina"]:
+        abort(403)
+
+    session = Session.query.get_or_404(session_id)
 
-    filename = f"attendance_{session.name.replace(' ', '_')}_{session.date}.docx"
+    return Response(
+        stream_with_context(iter_csv(export_rows(session_id))),
+        mimetype="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename={export_filename(session, 'csv')}"
+        }
+    )
+
+@app.route("/export/attendance/<int:session_id>/xlsx")
+@login_required
+def export_attendance_xlsx(session_id):
+    """Excel export built in openpyxl write-only mode, rows spooled to a temp file"""
+    if current_user.role not in ["admin", "ketua", "pembina"]:
+        abort(403)
+
+    session = Session.query.get_or_404(session_id)
+    workbook = write_xlsx(export_rows(session_id), title=session.name or 'Attendance')
+
+    return Response(
+        iter_file(workbook),
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename={export_filename(session, 'xlsx')}"
+        }
+    )
+
+@app.route("/export/attendance/<int:session_id>/text")
+@login_required
+def export_attendance_text(session_id):
+    """
+    Plain-text "Name | Status | HH:MM |" report, formatted locally and
+    streamed. ?mode=llm runs the old Groq formatter instead (slower, capped
+    by its token limit).
+    """
+    if current_user.role not in ["admin", "ketua", "pembina"]:
+        abort(403)
+
+    session = Session.query.get_or_404(session_id)
+    lines = format_attendance_rows(formatter_rows(session_id))
+
+    if request.args.get("mode") == "llm":
+        raw = "\n".join(lines)
+        try:
+            text = format_attendance(raw, use_llm=True)
+        except APIKeyError:
+            return jsonify({"error": "unavailable", "message": "AI formatter is not configured"}), 503
+        return Response(text, mimetype="text/plain")
+
+    return Response(
+        stream_with_context(f"{line}\n" for line in lines),
+        mimetype="text/plain",
+        headers={
+            "Content-Disposition": f"inline; filename={export_filename(session, 'txt')}"
+        }
+    )
+
+def report_job_json(job):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "format": job.format,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "download_url": url_for('download_term_report', job_id=job.id) if job.status == 'done' else None
+    }
+
+def get_report_job_or_404(job_id):
+    """Load a report job the current user may see, metadata only"""
+    job = (
+        ReportJob.query
+        .options(defer(ReportJob.data))
+        .filter_by(id=job_id)
+        .first_or_404()
+    )
+    if job.requested_by != current_user.id and current_user.role != 'admin':
+        abort(403)
+    return job
+
+@app.route("/api/reports/term", methods=["POST"])
+@login_required
+def create_term_report():
+    """
+    Queue a multi-session report. The file is built by a background worker;
+    poll the returned status_url until it's done, then download it.
+
+    Body: {"term": "2025-1"} or {"start": "2025-07-01", "end": "2026-01-01"},
+          plus "format": xlsx (default) | docx | zip
+    """
+    if current_user.role not in ["admin", "ketua", "pembina"]:
+        return jsonify({"error": "forbidden", "message": "Permission denied"}), 403
+
+    data = request.get_json(silent=True) or {}
+    fmt = data.get("format", "xlsx")
+    if fmt not in REPORT_FORMATS:
+        return jsonify({"error": "invalid_data", "message": "format must be xlsx, docx or zip"}), 400
+
+    if data.get("term"):
+        parsed = parse_term(data["term"])
+        if not parsed:
+            return jsonify({"error": "invalid_data", "message": "term must look like 2025-1"}), 400
+        year, term = parsed
+        start, end = term_bounds(year, term)
+        title = f"Attendance Report {year}/{year + 1} Semester {term}"
+    else:
+        start = parse_range_date(data.get("start"))
+        end = parse_range_date(data.get("end"))
+        if not start or not end or end <= start:
+            return jsonify({"error": "invalid_data", "message": "Pass term or start/end"}), 400
+        title = f"Attendance Report {start.isoformat()} - {(end - timedelta(days=1)).isoformat()}"
+
+    job = report_queue.enqueue_report(current_user.id, start, end, fmt, title)
+    response = report_job_json(job)
+    response["status_url"] = url_for('term_report_status', job_id=job.id)
+    return jsonify(response), 202
+
+@app.route("/api/reports/<int:job_id>", methods=["GET"])
+@login_required
+def term_report_status(job_id):
+    return jsonify(report_job_json(get_report_job_or_404(job_id)))
 
+@app.route("/api/reports/<int:job_id>/download", methods=["GET"])
+@login_required
+def download_term_report(job_id):
+    job = get_report_job_or_404(job_id)
+    if job.status != 'done':
+        return jsonify({"error": "not_ready", "status": job.status, "progress": job.progress}), 409
+
+    data = db.session.query(ReportJob.data).filter_by(id=job_id).scalar()
+    filename = f"{job.title.replace(' ', '_').replace('/', '-')}.{job.format}"
     return Response(
-        bio,
-        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        data,
+        mimetype=REPORT_FORMATS[job.format],
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
@@ -433,14 +969,17 @@ def delete_pic(id):
 
 @app.route('/attendance-history')
 @login_required
+@query_budget.limit(3)
 def attendance_history():
-    records = Attendance.query.filter_by(user_id=current_user.id).all()
+    # the template shows session date/name per row, load them in the same query
+    records = (
+        Attendance.query
+        .options(joinedload(Attendance.session))
+        .filter_by(user_id=current_user.id)
+        .all()
+    )
 
-    summary = {
-        'present': sum(1 for r in records if r.status=='present'),
-        'absent': sum(1 for r in records if r.status=='absent'),
-        'excused': sum(1 for r in records if r.status=='excused')
-    }
+    summary = status_counts(user_id=current_user.id)
 
     return render_template('attendance_history.html', records=records, summary=summary)
 
@@ -450,23 +989,33 @@ def attendance_history_admin():
     if current_user.role not in ['admin', 'ketua', 'pembina']:
         return redirect(url_for('invalid_credential')) 
     users = User.query.filter(User.role=='member').all()
-    return render_template('attendance_history_admin.html', users=users)
+
+    # current school term and the two before it
+    year, term = term_for(date.today())
+    report_terms = []
+    for _ in range(3):
+        report_terms.append((f"{year}-{term}", f"{year}/{year + 1} Semester {term}"))
+        year, term = (year, 1) if term == 2 else (year - 1, 2)
+
+    return render_template('attendance_history_admin.html', users=users, report_terms=report_terms)
 
 @app.route('/attendance-history-admin/<int:user_id>')
 @login_required
+@query_budget.limit(4)
 def attendance_history_admin_view(user_id):
     if current_user.role not in ['admin', 'ketua', 'pembina']:
         return redirect(url_for('invalid_credential'))
     
     selected_user = User.query.get_or_404(user_id)
 
-    records = Attendance.query.filter_by(user_id=user_id).all()
+    records = (
+        Attendance.query
+        .options(joinedload(Attendance.session))
+        .filter_by(user_id=user_id)
+        .all()
+    )
     
-    summary = {
-        'present': sum(1 for r in records if r.status=='present'),
-        'absent': sum(1 for r in records if r.status=='absent'),
-        'excused': sum(1 for r in records if r.status=='excused')
-    }
+    summary = status_counts(user_id=user_id)
     return render_template('attendance_history_admin_view.html', user=selected_user, records=records, summary=summary)
 
 @app.route('/attendance-mark')
@@ -478,6 +1027,44 @@ def attendance_mark():
     users = User.query.filter(User.role == 'member').all()
     return render_template('attendance_mark_core.html', sessions=sessions, users=users)
 
+def insert_ignore_duplicates(model, rows, index_elements):
+    """
+    Build one multi-row INSERT that skips rows violating the given unique
+    columns on PostgreSQL/SQLite (plain INSERT elsewhere).
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return pg_insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == 'sqlite':
+        return sqlite_insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+    return sa_insert(model).values(rows)
+
+def insert_attendance_rows(rows, returning=False):
+    """
+    Insert many attendance rows with one multi-row INSERT (caller commits).
+    Rows that hit unique_session_user are skipped on PostgreSQL/SQLite, so a
+    concurrent submission for the same member can't fail the whole batch.
+
+    Args:
+        rows: list of dicts with Attendance column values
+        returning: report which user_ids were actually inserted
+
+    Returns:
+        Number of rows inserted (-1 if the driver can't tell), or with
+        returning=True the set of inserted user_ids (None if unsupported)
+    """
+    if not rows:
+        return set() if returning else 0
+
+    stmt = insert_ignore_duplicates(Attendance, rows, ['session_id', 'user_id'])
+
+    if not returning:
+        return db.session.execute(stmt).rowcount
+    if not db.session.get_bind().dialect.insert_returning:
+        db.session.execute(stmt)
+        return None
+    return {user_id for (user_id,) in db.session.execute(stmt.returning(Attendance.user_id))}
+
 @app.route('/attendance', methods=['GET', 'POST'])
 @login_required
 def attendance():
@@ -501,18 +1088,37 @@ def attendance():
         if is_pic:
             if not can_mark_attendance(current_user, session.pic_id):
                 abort(403)
-            members = User.query.filter_by(pic_id=current_user.id).all()
+            member_ids = db.session.query(User.id).filter_by(pic_id=current_user.id)
         else:
-            members = User.query.filter(User.role == 'member').all()
+            member_ids = db.session.query(User.id).filter(User.role == 'member')
         
-        wib = timezone(timedelta(hours=7))
-        for member in members:
-            status = request.form.get(f'status_{member.id}')
+        statuses = {}
+        for (member_id,) in member_ids:
+            status = request.form.get(f'status_{member_id}')
             if status:
-                existing = Attendance.query.filter_by(session_id=session_id, user_id=member.id, attendance_type='regular').first()
-                if not existing:
-                    attendance = Attendance(session_id=session_id, user_id=member.id, status=status, attendance_type='regular', timestamp=datetime.now(wib))
-                    db.session.add(attendance)
+                statuses[member_id] = status
+
+        if statuses:
+            # One lookup for everyone already marked instead of one per member
+            already_marked = {
+                user_id for (user_id,) in db.session.query(Attendance.user_id).filter(
+                    Attendance.session_id == session.id,
+                    Attendance.user_id.in_(statuses.keys())
+                )
+            }
+            wib = timezone(timedelta(hours=7))
+            now = datetime.now(wib)
+            insert_attendance_rows([
+                {
+                    'session_id': session.id,
+                    'user_id': member_id,
+                    'status': status,
+                    'attendance_type': 'regular',
+                    'timestamp': now
+                }
+                for member_id, status in statuses.items()
+                if member_id not in already_marked
+            ])
         db.session.commit()
         flash('Attendance saved', 'success')
         return redirect(url_for('attendance'))
@@ -562,6 +1168,14 @@ def change_password():
                 return redirect(url_for('dashboard_member'))
     return render_template('change_password.html')
 
+def replace_profile_picture_variants(user_id, variants):
+    """Swap a user's stored thumbnails for freshly generated ones (caller commits)"""
+    ProfilePictureVariant.query.filter_by(user_id=user_id).delete()
+    db.session.add_all([
+        ProfilePictureVariant(user_id=user_id, size=size, format=fmt, data=data)
+        for size, fmt, data in variants
+    ])
+
 @app.route("/profile/upload_pfp", methods=['POST'])
 @login_required
 def upload_pfp():
@@ -587,85 +1201,140 @@ def upload_pfp():
     
     # Read file as binary
     image_data = file.read()
+
+    # Resize once here so listings only ever ship small thumbnails
+    try:
+        variants = make_thumbnails(image_data)
+    except InvalidImageError:
+        flash('Invalid image file.', 'error')
+        return redirect(url_for('profile'))
     
-    # Store in database
-    current_user.profile_picture_data = image_data
-    current_user.profile_picture_filename = secure_filename(filename_attr)
+    # Store in its own table, User rows stay light
+    pfp = current_user.profile_picture_blob
+    if not pfp:
+        pfp = ProfilePicture(user_id=current_user.id)
+        db.session.add(pfp)
+    pfp.data = image_data
+    pfp.filename = secure_filename(filename_attr)
+    current_user.profile_picture_hash = content_hash(image_data)
+    replace_profile_picture_variants(current_user.id, variants)
     
     db.session.commit()
     flash('Profile picture updated successfully', 'success')
     return redirect(url_for('profile'))
 
+AVATAR_MIME_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp'
+}
+# a year, versioned URLs never change content
+AVATAR_MAX_AGE = 365 * 24 * 60 * 60
+
+def get_image_mimetype(filename):
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'png'
+    return AVATAR_MIME_TYPES.get(ext, 'image/png')
+
+@lru_cache(maxsize=1)
+def get_default_picture():
+    """Read the default avatar once per process, returns (data, hash) or None"""
+    default_path = os.path.join('static', 'uploads', 'profiles', 'default.png')
+    if not os.path.exists(default_path):
+        return None
+    with open(default_path, 'rb') as f:
+        data = f.read()
+    return data, content_hash(data)
+
+@app.template_global()
+def avatar_url(user, size=None):
+    """Versioned avatar URL, changes whenever the picture does so it can be cached forever"""
+    version = user.profile_picture_hash
+    if not version:
+        default = get_default_picture()
+        version = default[1] if default else None
+    return url_for('serve_profile_picture', user_id=user.id, v=version, size=size)
+
 # Add route to serve profile pictures from database:
 @app.route("/profile-picture/<int:user_id>")
 def serve_profile_picture(user_id):
     user = User.query.get_or_404(user_id)
-    
-    if user.profile_picture_data:
-        # Determine mime type from filename
-        filename = user.profile_picture_filename or 'image.png'
-        ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'png'
-        
-        mime_types = {
-            'png': 'image/png',
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'webp': 'image/webp'
-        }
-        
-        mime_type = mime_types.get(ext, 'image/png')
-        
-        return Response(user.profile_picture_data, mimetype=mime_type)
+    size = pick_thumbnail_size(request.args.get('size'))
+    fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+
+    if user.profile_picture_hash:
+        version = user.profile_picture_hash
+        etag = f"{version}-{size}-{fmt}" if size else version
     else:
-        # Serve default image
-        default_path = os.path.join('static', 'uploads', 'profiles', 'default.png')
-        if os.path.exists(default_path):
-            with open(default_path, 'rb') as f:
-                return Response(f.read(), mimetype='image/png')
-        else:
+        default = get_default_picture()
+        if not default:
             abort(404)
-
-ISLAMIC_HOLIDAYS = {
-    # Muharram
-    "01-01": "Islamic New Year",
-    "01-09": "Day of Tasua",
-    "01-10": "Day of Ashura",
-
-    # Rabi' al-Awwal
-    "03-12": "Mawlid al-Nabi",
-
-    # Rajab
-    "07-01": "Start of Rajab",
-    "07-27": "Isra and Mi'raj",
-
-    # Sha'ban
-    "08-15": "Mid-Sha'ban (Laylat al-Bara'ah)",
-
-    # Ramadan
-    "09-01": "Start of Ramadan",
-    "09-17": "Nuzul al-Qur'an",
-    "09-21": "Laylat al-Qadr (possible)",
-    "09-23": "Laylat al-Qadr (possible)",
-    "09-25": "Laylat al-Qadr (possible)",
-    "09-27": "Laylat al-Qadr (possible)",
-    "09-29": "Laylat al-Qadr (possible)",
-
-    # Shawwal
-    "10-01": "Eid al-Fitr",
-    "10-02": "Eid al-Fitr ",
-
-    # Dhu al-Qi'dah
-    "11-01": "Start of Dhuqa'dah",
-
-    # Dhu al-Hijjah
-    "12-01": "Start of Dhu al-Hijjah",
-    "12-08": "Day of Tarwiyah",
-    "12-09": "Day of Arafah",
-    "12-10": "Eid al-Adha",
-    "12-11": "Days of Tashreeq",
-    "12-12": "Days of Tashreeq",
-    "12-13": "Days of Tashreeq",
-}
+        version = etag = default[1]
+
+    # A missing thumbnail is stood in for by the original, served under the
+    # plain version tag; that's the tag the browser revalidates with
+    served_etag = etag
+    fallback = False
+    has_variant = None
+
+    def variant_exists():
+        # existence only, never loads the BLOB
+        nonlocal has_variant
+        if has_variant is None:
+            has_variant = db.session.query(ProfilePictureVariant.user_id).filter_by(
+                user_id=user_id, size=size, format=fmt
+            ).first() is not None
+        return has_variant
+
+    if request.if_none_match.contains(etag):
+        # Browser already has it, don't touch the BLOB at all
+        response = Response(status=304)
+    elif size and user.profile_picture_hash and request.if_none_match.contains(version) \
+            and not variant_exists():
+        # Browser has the original we sent in place of the thumbnail, still current
+        served_etag = version
+        fallback = True
+        response = Response(status=304)
+    elif user.profile_picture_hash:
+        cached = avatar_cache.get(etag)
+        if cached and cached[2] != etag and variant_exists():
+            # thumbnail was built since the original got cached in its place
+            cached = None
+        if cached:
+            data, mime_type, served_etag = cached
+            fallback = served_etag != etag
+        else:
+            variant = ProfilePictureVariant.query.get((user_id, size, fmt)) if size else None
+            if variant:
+                data = variant.data
+                mime_type = VARIANT_FORMATS[fmt][1]
+            else:
+                # No thumbnail yet (not backfilled), fall back to the original
+                pfp = ProfilePicture.query.get_or_404(user_id)
+                data = pfp.data
+                mime_type = get_image_mimetype(pfp.filename or 'image.png')
+                served_etag = version
+                fallback = bool(size)
+            # keyed by what we looked up, so the next request hits the cache
+            avatar_cache.put(etag, data, mime_type, served_etag)
+        response = Response(data, mimetype=mime_type)
+    else:
+        # Serve default image
+        response = Response(default[0], mimetype='image/png')
+
+    response.set_etag(served_etag)
+    if size:
+        response.vary.add('Accept')
+    if request.args.get('v') == version and not fallback:
+        response.cache_control.public = True
+        response.cache_control.max_age = AVATAR_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # Unversioned URL, or the original standing in for a thumbnail that
+        # isn't built yet: let the browser revalidate with the ETag so it
+        # picks up the thumbnail once the backfill has run
+        response.cache_control.no_cache = True
+    return response
 
 @app.route("/calendar")
 @login_required
@@ -673,61 +1342,46 @@ def calendar():
     
     return render_template("calendar.html")
 
-def get_hijri_date(gregorian_date):
-    try:
-        g = datetime.strptime(gregorian_date, "%Y-%m-%d").date()
-        h = HijriDate(g.year, g.month, g.day, gr=True)
-        return f"{h.day} {h.month_name} {h.year} H"
-    except Exception:
-        return ""
-
-def get_hijri_key_from_gregorian(g_date: date):
-    h = HijriDate(g_date.year, g_date.month, g_date.day, gr=True)
-    return f"{h.month:02d}-{h.day:02d}", h
-
-
-    
 @app.route('/api/dashboard_calendar')
 @login_required
 def api_dashboard_calendar():
-    sessions = Session.query.all()
+    # FullCalendar sends the visible window as ?start=...&end=... (end exclusive)
+    start = parse_range_date(request.args.get('start'))
+    end = parse_range_date(request.args.get('end'))
+    if not start or not end or end <= start:
+        today = date.today()
+        start = date(today.year - 1, 1, 1)
+        end = date(today.year + 2, 1, 1)
+    # never compute more than MAX_RANGE of Hijri dates per request
+    if end - start > MAX_HIJRI_RANGE:
+        end = start + MAX_HIJRI_RANGE
+
+    sessions = sessions_between(start, end).all()
     calendar_events = []
 
     for session in sessions:
-        hijri_date = get_hijri_date(session.date)
+        hijri_date = hijri_label(session.date)
         calendar_events.append({
-            'title': f"{session.name} ({hijri_date})",
-            'start': session.date,
+            'title': f"{session.name} ({hijri_date})" if hijri_date else session.name,
+            'start': session.date.isoformat() if session.date else None,
             'extendedProps': {
                 'type': 'rohis_session'
             }
         })
 
-    today = date.today()
-    start_year = today.year - 1
-    end_year = today.year + 1
-
-    current = date(start_year, 1, 1)
-    end = date(end_year, 12, 31)
-
-    while current <= end:
-        hijri_key, hijri = get_hijri_key_from_gregorian(current)
-
-        if hijri_key in ISLAMIC_HOLIDAYS:
-            calendar_events.append({
-                'title': f"{ISLAMIC_HOLIDAYS[hijri_key]} ({hijri.day} {hijri.month_name} {hijri.year} H)",
-                'start': current.isoformat(),
-                'allDay': True,
-                'backgroundColor': '#1e88e5',
-                'borderColor': '#1565c0',
-                'textColor': '#ffffff',
-                'extendedProps': {
-                    'type': 'islamic_holiday',
-                    'hijri': f"{hijri.day} {hijri.month_name} {hijri.year} H"
-                }
-            })
-
-        current = current.fromordinal(current.toordinal() + 1)
+    for holiday_date, name, hijri in holidays_between(start, end):
+        calendar_events.append({
+            'title': f"{name} ({hijri})",
+            'start': holiday_date.isoformat(),
+            'allDay': True,
+            'backgroundColor': '#1e88e5',
+            'borderColor': '#1565c0',
+            'textColor': '#ffffff',
+            'extendedProps': {
+                'type': 'islamic_holiday',
+                'hijri': hijri
+            }
+        })
     return jsonify(calendar_events)
 
 def allowed_file(filename):
@@ -742,6 +1396,26 @@ def chat():
     if not user_message:
         return jsonify({"reply": "Please type a question."})
 
+    if data.get("stream"):
+        # Server-sent events: tokens as they arrive, then the final reply
+        def events():
+            for event, payload in stream_chatbot_groq(user_message):
+                if event == "token":
+                    payload = {"text": payload}
+                else:
+                    payload = {"reply": payload}
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+        return Response(
+            stream_with_context(events()),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                # stop nginx-style proxies from buffering the whole stream
+                "X-Accel-Buffering": "no"
+            }
+        )
+
     try:
         reply = call_chatbot_groq(user_message)
     except Exception as e:
@@ -751,6 +1425,18 @@ def chat():
 
     return jsonify({"reply": reply})
 
+@app.route("/api/chat/stats")
+@login_required
+def chat_stats():
+    """Chatbot counters: intent router hits (this worker) and answer cache metrics (all workers)"""
+    if current_user.role not in ['admin', 'ketua', 'pembina']:
+        return jsonify({"error": "forbidden"}), 403
+    try:
+        cache_stats = answer_cache.stats()
+    except Exception as e:
+        cache_stats = {"error": str(e)}
+    return jsonify({"intent_router": get_router_stats(), "answer_cache": cache_stats})
+
 @app.route('/pic-management', methods=['GET', 'POST'])
 @login_required
 def pic_management():
@@ -759,7 +1445,7 @@ def pic_management():
         abort(403)
 
     pics = Pic.query.all()
-    users = User.query.filter_by(role='member').all()
+    users = User.query.options(selectinload(User.pic)).filter_by(role='member').all()
 
     if request.method == 'POST':
         user_ids = request.form.getlist('user_ids')
@@ -816,13 +1502,20 @@ def save_notulensi(session_id):
     note = Notulensi.query.filter_by(session_id=session_id).first()
 
     if note:
+        if note.content != content:
+            # content changed, the stored summary is stale
+            note.summary = None
+            note.summary_key = None
         note.content = content
         note.updated_at = datetime.utcnow()
     else:
         note = Notulensi(session_id=session_id, content=content)
         db.session.add(note)
+    # strip the HTML once here instead of on every list / feed render
+    note.plain_text, note.excerpt = plain_text_fields(content)
 
     db.session.commit()
+    summary_queue.enqueue_summary(note)
     return jsonify({"success": True})
 
 @app.route("/api/notulensi/<int:notulensi_id>", methods=["DELETE"])
@@ -841,7 +1534,8 @@ def delete_notulensi(notulensi_id):
 @login_required
 def notulensi_list():
     sessions = Session.query.order_by(Session.date.desc()).all()
-    notulensis = Notulensi.query.all()
+    # cards only need the excerpt, not the full bodies
+    notulensis = Notulensi.query.options(defer(Notulensi.content), defer(Notulensi.plain_text)).all()
     notulensi_dict = {n.session_id: n for n in notulensis}
     
     return render_template("notulensi_list.html", sessions=sessions, notulensi_dict=notulensi_dict)
@@ -875,13 +1569,14 @@ def news_feed():
         
         # Get upcoming sessions
         upcoming_sessions = Session.query.filter(
-            Session.date >= str(today)
+            Session.date >= today
         ).order_by(Session.date.asc()).limit(3).all()
         
         # Get recent notulensi
         recent_notulensi = (
             db.session.query(Notulensi, Session)
             .join(Session, Notulensi.session_id == Session.id)
+            .options(defer(Notulensi.plain_text))
             .order_by(Notulensi.updated_at.desc())
             .limit(3)
             .all()
@@ -894,7 +1589,7 @@ def news_feed():
                 upcoming_data.append({
                     'id': session.id,
                     'name': session.name,
-                    'date': session.date,
+                    'date': session.date.isoformat() if session.date else None,
                     'pic': session.pic.name if session.pic else 'No PIC assigned'
                 })
             except Exception as e:
@@ -903,42 +1598,32 @@ def news_feed():
         
         # Process recent notulensi with better error handling
         recent_data = []
+        stale_notes = []
         for notulensi, session in recent_notulensi:
             try:
                 # Try to generate summary, but have multiple fallbacks
-                summary = "Meeting notes available."
+                summary = FALLBACK_SUMMARY
                 
                 if notulensi and notulensi.content:
                     try:
-                        # Only try to summarize if GROQ_API_KEY exists
-                        if os.environ.get("GROQ_API_KEY"):
-                            summary = summarize_notulensi(notulensi.content)
+                        cache_key = get_summary_cache_key(notulensi.id, notulensi.content)
+                        if notulensi.summary and notulensi.summary_key == cache_key:
+                            # Already summarized this revision, no LLM call
+                            summary = notulensi.summary
                         else:
-                            #Fallback besik
-                            from html import unescape
-                            import re
-                            clean_text = re.sub('<[^<]+?>', '', notulensi.content)
-                            clean_text = unescape(clean_text).strip()
-                            if len(clean_text) > 150:
-                                summary = clean_text[:150] + "..."
-                            else:
-                                summary = clean_text if clean_text else "Meeting notes available."
+                            # Never wait on Groq here, the worker fills it in
+                            stale_notes.append(notulensi)
+                            # Meanwhile (or with no API key at all) the stored
+                            # local summary, computed when the note was saved
+                            summary = notulensi.excerpt or local_summary(notulensi.content)
                     except Exception as sum_error:
                         print(f"Summarization error for notulensi {notulensi.id}: {sum_error}")
-                        # Fallback brok
-                        try:
-                            from html import unescape
-                            import re
-                            clean_text = re.sub('<[^<]+?>', '', notulensi.content)
-                            clean_text = unescape(clean_text).strip()
-                            summary = clean_text[:150] + "..." if len(clean_text) > 150 else (clean_text or "Meeting notes available.")
-                        except:
-                            summary = "Meeting notes available."
+                        summary = notulensi.excerpt or FALLBACK_SUMMARY
                 
                 recent_data.append({
                     'id': notulensi.id,
                     'session_name': session.name,
-                    'session_date': session.date,
+                    'session_date': session.date.isoformat() if session.date else None,
                     'summary': summary,
                     'updated_at': notulensi.updated_at.strftime('%d %b %Y') if notulensi.updated_at else notulensi.created_at.strftime('%d %b %Y')
                 })
@@ -947,6 +1632,14 @@ def news_feed():
                 import traceback
                 traceback.print_exc()
                 continue
+
+        if stale_notes:
+            try:
+                # one batched Groq request for all of them
+                # (skips revisions that already have a job)
+                summary_queue.enqueue_summaries(stale_notes)
+            except Exception as e:
+                print(f"Summary enqueue error: {e}")
         
         return jsonify({
             'success': True,
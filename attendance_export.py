@@ -0,0 +1,114 @@
+import csv
+import tempfile
+from io import StringIO
+from openpyxl import Workbook
+from models import db, Attendance, User
+
+EXPORT_COLUMNS = ('Name', 'Email', 'Role', 'Status', 'Time', 'Type')
+
+# Rows fetched per round trip; PostgreSQL uses a server-side cursor so only
+# one batch is ever held in memory
+FETCH_BATCH = 500
+FILE_CHUNK = 64 * 1024
+
+
+def export_rows(session_id: int, batch_size: int = FETCH_BATCH):
+    """
+    Attendance rows for one session, ordered by member name, fetched
+    lazily in batches.
+
+    Yields:
+        Tuples in EXPORT_COLUMNS order
+    """
+    query = (
+        db.session.query(
+            User.name,
+            User.email,
+            User.role,
+            Attendance.status,
+            Attendance.timestamp,
+            Attendance.attendance_type
+        )
+        .join(User, Attendance.user_id == User.id)
+        .filter(Attendance.session_id == session_id)
+        .order_by(User.name, User.id)
+        .yield_per(batch_size)
+    )
+    for name, email, role, status, timestamp, attendance_type in query:
+        yield (
+            name,
+            email,
+            (role or '').capitalize(),
+            (status or '').capitalize(),
+            # stored in WIB already
+            timestamp.strftime('%Y-%m-%d %H:%M') if timestamp else '',
+            (attendance_type or '').capitalize(),
+        )
+
+
+def formatter_rows(session_id: int, batch_size: int = FETCH_BATCH):
+    """
+    (name, status, timestamp) rows for formatter.format_attendance_rows,
+    same order and batching as export_rows.
+    """
+    return (
+        db.session.query(User.name, Attendance.status, Attendance.timestamp)
+        .join(User, Attendance.user_id == User.id)
+        .filter(Attendance.session_id == session_id)
+        .order_by(User.name, User.id)
+        .yield_per(batch_size)
+    )
+
+
+def iter_csv(rows):
+    """
+    Encode rows as CSV one line at a time, header first.
+
+    Yields:
+        str chunks ready to send
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        # flush every row, the buffer never grows past one line
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_xlsx(rows, title: str = 'Attendance'):
+    """
+    Write rows to an XLSX file with openpyxl's write-only mode, which
+    spools each row to disk instead of keeping a worksheet in memory.
+
+    Returns:
+        Temporary file positioned at the start, deleted when closed
+    """
+    workbook = Workbook(write_only=True)
+    # sheet titles are capped at 31 chars and can't contain []:*?/\
+    sheet = workbook.create_sheet(title=''.join(c for c in title if c not in '[]:*?/\\')[:31] or 'Attendance')
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def iter_file(handle, chunk_size: int = FILE_CHUNK):
+    """Read a file in chunks and close it when done"""
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
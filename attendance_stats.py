@@ -0,0 +1,61 @@
+from sqlalchemy import func
+from models import db, Attendance
+
+# Display order for summaries and reports
+ATTENDANCE_STATUSES = ('present', 'absent', 'excused', 'late')
+
+
+def _filtered(query, session_id=None, user_id=None, attendance_type=None):
+    if session_id is not None:
+        query = query.filter(Attendance.session_id == session_id)
+    if user_id is not None:
+        query = query.filter(Attendance.user_id == user_id)
+    if attendance_type is not None:
+        query = query.filter(Attendance.attendance_type == attendance_type)
+    return query
+
+
+def status_counts(session_id=None, user_id=None, attendance_type=None) -> dict:
+    """
+    Count attendance per status with one GROUP BY query.
+
+    Args:
+        session_id: Only count this session
+        user_id: Only count this member
+        attendance_type: 'regular' or 'core', both if None
+
+    Returns:
+        dict with a count for every status in ATTENDANCE_STATUSES plus 'total'
+    """
+    rows = _filtered(
+        db.session.query(Attendance.status, func.count(Attendance.id)),
+        session_id, user_id, attendance_type
+    ).group_by(Attendance.status).all()
+
+    counts = dict.fromkeys(ATTENDANCE_STATUSES, 0)
+    counts.update(rows)
+    counts['total'] = sum(count for _, count in rows)
+    return counts
+
+
+def status_counts_by(column, session_id=None, user_id=None, attendance_type=None) -> dict:
+    """
+    Per-status counts broken down by another column, still one query.
+
+    Args:
+        column: Attendance column to group on, e.g. Attendance.user_id
+
+    Returns:
+        dict of column value -> status_counts()-shaped dict
+    """
+    rows = _filtered(
+        db.session.query(column, Attendance.status, func.count(Attendance.id)),
+        session_id, user_id, attendance_type
+    ).group_by(column, Attendance.status).all()
+
+    grouped = {}
+    for key, status, count in rows:
+        counts = grouped.setdefault(key, dict.fromkeys(ATTENDANCE_STATUSES, 0) | {'total': 0})
+        counts[status] = count
+        counts['total'] += count
+    return grouped
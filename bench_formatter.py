@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local attendance formatter vs the Groq (LLM) formatter
+
+Builds a throwaway session with N attendance rows (default 1000) and times
+both paths on it, checking that every record survives formatting.
+The LLM leg needs GROQ_API_KEY, or the fake server:
+
+    python fake_groq.py --latency 2 &
+    GROQ_BASE_URL=http://127.0.0.1:8089 GROQ_API_KEY=fake python bench_formatter.py
+
+Usage:
+    python bench_formatter.py [rows] [--local-only]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 1000
+LOCAL_RUNS = 20
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_formatter.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "bench-formatter")
+
+from app import app, db  # noqa: E402
+from models import User, Session, Attendance  # noqa: E402
+from attendance_export import formatter_rows  # noqa: E402
+from formatter import format_attendance, format_attendance_rows  # noqa: E402
+
+STATUSES = ["present", "absent", "excused", "late"]
+
+
+def seed():
+    db.create_all()
+    session = Session(name="Benchmark", date=date(2026, 3, 1))
+    db.session.add(session)
+    db.session.flush()
+
+    db.session.execute(User.__table__.insert(), [
+        dict(email=f"bench{i}@example.com", password="x", name=f"Member {i:04d}", role="member")
+        for i in range(ROWS)
+    ])
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+    start = datetime(2026, 3, 1, 7, 0)
+    db.session.execute(Attendance.__table__.insert(), [
+        dict(session_id=session.id, user_id=user_id, status=STATUSES[i % 4],
+             attendance_type="regular", timestamp=start + timedelta(seconds=7 * i))
+        for i, user_id in enumerate(user_ids)
+    ])
+    db.session.commit()
+    return session.id
+
+
+def bench_local(session_id):
+    timings = []
+    for _ in range(LOCAL_RUNS):
+        started = time.perf_counter()
+        lines = list(format_attendance_rows(formatter_rows(session_id)))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return lines, timings[len(timings) // 2]
+
+
+def bench_llm(raw_text):
+    started = time.perf_counter()
+    output = format_attendance(raw_text, use_llm=True)
+    return output, time.perf_counter() - started
+
+
+def main():
+    with app.app_context():
+        session_id = seed()
+
+        lines, local_seconds = bench_local(session_id)
+        print(f"rows: {ROWS}")
+        print(f"local: {local_seconds * 1000:.1f} ms (median of {LOCAL_RUNS}), {len(lines)} lines")
+        if len(lines) != ROWS:
+            print("local formatter lost records!")
+            return 1
+
+        if "--local-only" in sys.argv or not os.environ.get("GROQ_API_KEY"):
+            print("llm: skipped (set GROQ_API_KEY or use fake_groq.py)")
+            return 0
+
+        # same records as raw text, the way the LLM path receives them
+        raw_text = "\n".join(
+            f"{name}, {status}, {timestamp.isoformat(timespec='seconds')}"
+            for name, status, timestamp in formatter_rows(session_id)
+        )
+        output, llm_seconds = bench_llm(raw_text)
+        llm_lines = [line for line in output.splitlines() if line.strip()]
+        print(f"llm: {llm_seconds * 1000:.1f} ms, {len(llm_lines)} lines")
+        if output.startswith("FORMATTING_ERROR"):
+            print(f"llm error: {output}")
+        elif len(llm_lines) != ROWS:
+            print(f"llm output truncated or altered: {len(llm_lines)} of {ROWS} records")
+        print(f"speedup: {llm_seconds / local_seconds:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
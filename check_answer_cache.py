@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate check for the chatbot answer cache
+
+Stores a handful of questions in a throwaway cache with near-duplicate
+matching on, then asks reworded and opposite versions of them. Reworded
+questions must hit; questions whose meaning flips (a negation, contracted
+or not, or a different number) must miss.
+
+Usage:
+    python check_answer_cache.py
+"""
+import os
+import sys
+import tempfile
+
+from answer_cache import AnswerCache
+
+STORED = [
+    "why can muslims eat pork during ramadan at night",
+    "apakah boleh makan saat puasa",
+    "kapan puasa ramadan 2025",
+    "apa itu wudu",
+    "do i have to pray when traveling",
+]
+
+# (question, stored question it must hit, or None for a miss)
+CASES = [
+    ("apa itu wudu ya", "apa itu wudu"),
+    ("tolong apa itu wudu", "apa itu wudu"),
+    ("Apakah boleh makan saat puasa?", "apakah boleh makan saat puasa"),
+    ("why can't muslims eat pork during ramadan at night", None),
+    ("why can’t muslims eat pork during ramadan at night", None),
+    ("why cannot muslims eat pork during ramadan at night", None),
+    ("don't i have to pray when traveling", None),
+    ("apakah tidak boleh makan saat puasa", None),
+    ("apakah gak boleh makan saat puasa", None),
+    ("kapan puasa ramadan 2026", None),
+]
+
+
+def main():
+    cache = AnswerCache(path=os.path.join(tempfile.mkdtemp(), "check_answer_cache.db"),
+                        near_duplicates=True)
+    for question in STORED:
+        cache.put(question, {"answer": question})
+
+    failures = 0
+    for question, expected in CASES:
+        reply = cache.get(question)
+        got = reply["answer"] if reply else None
+        ok = got == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {question!r:60} -> {got!r}")
+
+    print(f"{len(CASES) - failures}/{len(CASES)} ok")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
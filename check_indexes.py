@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Index usage check for Rohis Management System
+
+Runs EXPLAIN on the queries behind the busiest routes and fails if the
+planner isn't using the index we added for them. Works on SQLite
+(EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN, with sequential scans
+disabled so tiny dev tables don't hide a missing index).
+
+Usage:
+    python check_indexes.py              # throwaway SQLite database
+    DATABASE_URL=postgresql://... python check_indexes.py --existing
+    # --existing: check the configured database as-is (run `flask db upgrade` first)
+"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+if "--existing" not in sys.argv:
+    _db_file = os.path.join(tempfile.mkdtemp(), "check_indexes.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "check-indexes")
+
+from sqlalchemy import func, text  # noqa: E402
+from app import app, db  # noqa: E402
+from models import User, Session, Attendance  # noqa: E402
+
+
+def route_queries():
+    """(description, query, index the plan must mention) for each hot lookup"""
+    return [
+        ("attendance history",
+         Attendance.query.filter_by(user_id=1),
+         "ix_attendance_user_id_status"),
+        ("member status counts",
+         db.session.query(Attendance.status, func.count(Attendance.id))
+         .filter(Attendance.user_id == 1).group_by(Attendance.status),
+         "ix_attendance_user_id_status"),
+        ("attendance map",
+         Attendance.query.filter_by(session_id=1, attendance_type='regular'),
+         "ix_attendance_session_id_type"),
+        ("member listing",
+         User.query.filter(User.role == 'member'),
+         "ix_user_role"),
+        ("PIC members",
+         User.query.filter_by(pic_id=1),
+         "ix_user_pic_id"),
+        ("PIC session picker",
+         Session.query.filter_by(pic_id=1),
+         "ix_session_pic_id_date"),
+        ("upcoming sessions",
+         Session.query.filter(Session.date >= date(2026, 1, 1)).order_by(Session.date.asc()).limit(3),
+         "ix_session_date"),
+    ]
+
+
+def explain(query) -> str:
+    """Plan text for a query on the current database"""
+    dialect = db.engine.dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        return "\n".join(row[-1] for row in rows)
+
+    if dialect.name == 'postgresql':
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = db.session.execute(text(f"EXPLAIN {sql}")).fetchall()
+        return "\n".join(row[0] for row in rows)
+
+    raise SystemExit(f"Unsupported database: {dialect.name}")
+
+
+def main():
+    with app.app_context():
+        if "--existing" not in sys.argv:
+            db.create_all()
+
+        print(f"Checking index usage on {db.engine.dialect.name}")
+        failed = False
+        for description, query, index in route_queries():
+            plan = explain(query)
+            ok = index in plan
+            failed = failed or not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {description:<24} expects {index}")
+            if not ok:
+                print("     " + plan.replace("\n", "\n     "))
+        db.session.rollback()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
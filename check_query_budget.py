@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Query budget check for Rohis Management System
+
+Seeds a throwaway SQLite database with a realistic amount of history
+(one member with hundreds of attendance records), requests every route
+decorated with @query_budget.limit and fails if any of them runs more SQL
+statements than its budget. An N+1 regression shows up here as hundreds
+of queries instead of a handful.
+
+Usage:
+    python check_query_budget.py [records]
+"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+_db_file = os.path.join(tempfile.mkdtemp(), "query_budget.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "query-budget-check")
+os.environ.pop("GROQ_API_KEY", None)
+
+from app import app, db  # noqa: E402
+from models import User, Session, Attendance, Pic  # noqa: E402
+from query_budget import BUDGETS, QueryBudgetExceeded  # noqa: E402
+
+STATUSES = ["present", "absent", "excused", "late"]
+
+
+def seed():
+    """Create an admin, a PIC group of members and RECORDS sessions of history"""
+    db.create_all()
+    pic = Pic(name="PIC Budget")
+    db.session.add(pic)
+    db.session.flush()
+
+    admin = User(email="admin@example.com", password="x", name="Admin", role="admin",
+                 must_change_password=False)
+    members = [
+        User(email=f"member{i}@example.com", password="x", name=f"Member {i}", role="member",
+             must_change_password=False, pic_id=pic.id)
+        for i in range(20)
+    ]
+    db.session.add(admin)
+    db.session.add_all(members)
+    db.session.flush()
+
+    sessions = [Session(name=f"Session {i}", date=date(2026, 1, i % 28 + 1)) for i in range(RECORDS)]
+    db.session.add_all(sessions)
+    db.session.flush()
+
+    db.session.add_all([
+        Attendance(session_id=s.id, user_id=members[0].id, status=STATUSES[i % len(STATUSES)])
+        for i, s in enumerate(sessions)
+    ])
+    db.session.commit()
+    return admin.id, members[0].id
+
+
+def main():
+    app.config["TESTING"] = True
+    app.config["QUERY_BUDGET_STRICT"] = False  # collect every overrun, not just the first
+
+    with app.app_context():
+        admin_id, member_id = seed()
+
+    # URL for each budgeted view and who requests it
+    checks = {
+        "member_list": ("/member-list", admin_id),
+        "attendance_history": ("/attendance-history", member_id),
+        "attendance_history_admin_view": (f"/attendance-history-admin/{member_id}", admin_id),
+    }
+    missing = set(BUDGETS) - set(checks)
+    if missing:
+        print(f"No check configured for: {', '.join(sorted(missing))}")
+        return 1
+
+    failed = False
+    for view, (url, user_id) in checks.items():
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(user_id)
+            sess["_fresh"] = True
+
+        response = client.get(url)
+        count = int(response.headers.get("X-Query-Count", 0))
+        budget = BUDGETS[view]
+        ok = response.status_code == 200 and count <= budget
+        failed = failed or not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {view:<32} {count:>4} queries (budget {budget}, HTTP {response.status_code})")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except QueryBudgetExceeded as e:
+        print(f"FAIL {e}")
+        sys.exit(1)
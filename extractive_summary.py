@@ -0,0 +1,176 @@
+import math
+import re
+
+# Common Indonesian function words (plus a few English ones, notes are often mixed)
+INDONESIAN_STOPWORDS = frozenset("""
+ada adalah agar akan aku antara apa apakah atas atau bagai bagaimana bagi bahwa
+banyak baru belum berapa beberapa begitu bisa boleh bukan dalam dan dapat dari
+daripada demikian dengan di dia dilakukan diri dua hal harus hingga ia ialah ini
+itu jadi jika juga justru kalau kami kamu karena kata ke kecuali kemudian kepada
+kita lagi lain lalu lebih maka mampu mana masih mau melakukan melalui memang
+mengenai menjadi menurut mereka merupakan meski misalnya mungkin nanti namun oleh
+pada para perlu pula pun saat saja sama sampai sangat saya sebab sebagai sebelum
+sebuah secara sedang sedangkan sehingga sejak sekali selain selama seperti serta
+sesuatu setelah setiap sini situ suatu sudah supaya tanpa tapi telah tentang
+terhadap tersebut tetapi tidak untuk walau yaitu yakni yang
+a an and are as at be by for from has have in is it of on or that the this to
+was were will with
+""".split())
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+
+MAX_SENTENCES = 300     # cap for the O(n^2) similarity graph
+MIN_WORDS = 4           # shorter lines are headers / labels ("Notulensi Rapat")
+DAMPING = 0.85
+ITERATIONS = 30
+
+
+def split_sentences(text: str) -> list:
+    """Split clean text into sentences, one per line break or terminal punctuation"""
+    sentences = []
+    for part in SENTENCE_END.split(text or ""):
+        part = " ".join(part.split())
+        if part:
+            sentences.append(part)
+    return sentences[:MAX_SENTENCES]
+
+
+def _terms(sentence: str) -> list:
+    return [w for w in WORD.findall(sentence.lower()) if w not in INDONESIAN_STOPWORDS]
+
+
+def score_sentences(sentences: list) -> list:
+    """
+    TextRank over TF-IDF sentence vectors: a sentence scores high when it
+    shares weighted terms with many other sentences. Too-short sentences
+    (headers, dates, lone names) get zero.
+
+    Returns:
+        One float per sentence
+    """
+    terms = [_terms(s) for s in sentences]
+    n = len(sentences)
+    if n == 0:
+        return []
+
+    document_freq = {}
+    for words in terms:
+        for word in set(words):
+            document_freq[word] = document_freq.get(word, 0) + 1
+
+    vectors = []
+    for words in terms:
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        vector = {
+            word: (count / len(words)) * (math.log((1 + n) / (1 + document_freq[word])) + 1)
+            for word, count in counts.items()
+        }
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        vectors.append({word: v / norm for word, v in vector.items()})
+
+    eligible = [len(words) >= MIN_WORDS for words in terms]
+
+    # cosine similarity graph between eligible sentences, built from an
+    # inverted index so only pairs sharing a term are ever compared
+    postings = {}
+    for i, vector in enumerate(vectors):
+        if eligible[i]:
+            for word, v in vector.items():
+                postings.setdefault(word, []).append((i, v))
+
+    edges = [[] for _ in range(n)]
+    for i, vector in enumerate(vectors):
+        if not eligible[i]:
+            continue
+        dots = {}
+        for word, v in vector.items():
+            for j, w in postings[word]:
+                if j > i:
+                    dots[j] = dots.get(j, 0.0) + v * w
+        for j, weight in dots.items():
+            edges[i].append((j, weight))
+            edges[j].append((i, weight))
+
+    out_weight = [sum(w for _, w in edges[i]) for i in range(n)]
+    scores = [1.0 if eligible[i] else 0.0 for i in range(n)]
+    for _ in range(ITERATIONS):
+        scores = [
+            ((1 - DAMPING) + DAMPING * sum(scores[j] * w / out_weight[j] for j, w in edges[i]))
+            if eligible[i] else 0.0
+            for i in range(n)
+        ]
+
+    # with no overlap at all, fall back to term richness
+    if not any(edges):
+        scores = [float(len(set(words))) if eligible[i] else 0.0 for i, words in enumerate(terms)]
+    return scores
+
+
+def _pick(sentences, scores, fits):
+    """Take sentences best-first while fits() allows, return them in reading order"""
+    ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+    chosen = []
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        if fits(chosen, i):
+            chosen.append(i)
+    return [sentences[i] for i in sorted(chosen)]
+
+
+def extractive_summary(text: str, max_sentences: int = 2, max_chars: int = 300) -> str:
+    """
+    Local summary: the highest ranked sentences, kept in their original order.
+
+    Args:
+        text: Clean (tag-free) note text
+        max_sentences: Sentences to keep
+        max_chars: Hard cap on the result length
+
+    Returns:
+        Summary text, or "" if nothing in the text looks like a sentence
+    """
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences)
+
+    # budget what actually gets joined, including the added full stops
+    def fits(chosen, i):
+        used = sum(len(_ensure_stop(sentences[j])) + 1 for j in chosen)
+        return len(chosen) < max_sentences and used + len(_ensure_stop(sentences[i])) <= max_chars
+
+    picked = _pick(sentences, scores, fits)
+    if not picked:
+        # nothing short enough: trim the best sentence
+        best = max(range(len(sentences)), key=lambda i: (scores[i], -i), default=None)
+        if best is None or scores[best] <= 0:
+            return ""
+        sentence = sentences[best]
+        return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3].rstrip() + "..."
+    return " ".join(_ensure_stop(s) for s in picked)
+
+
+def compress_text(text: str, max_chars: int = 2000) -> str:
+    """
+    Shrink long notes to the most informative sentences under max_chars,
+    in reading order. Text already under the budget is returned unchanged.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences)
+
+    def fits(chosen, i):
+        return sum(len(sentences[j]) + 1 for j in chosen) + len(sentences[i]) <= max_chars
+
+    picked = _pick(sentences, scores, fits)
+    if not picked:
+        return text[:max_chars]
+    return "\n".join(picked)
+
+
+def _ensure_stop(sentence: str) -> str:
+    return sentence if sentence[-1] in ".!?" else sentence + "."
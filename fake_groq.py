@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Local fake Groq server for trying the AI features without a real API key
+
+Speaks just enough of the OpenAI-compatible chat completions API for the
+Groq SDK. Point the app at it with:
+
+    GROQ_BASE_URL=http://127.0.0.1:8089 GROQ_API_KEY=fake python app.py
+
+Usage:
+    python fake_groq.py [--port 8089] [--latency 0.5] [--fail-rate 0.2] [--reply "text" | --echo]
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    # filled in from the command line
+    latency = 0.0
+    fail_rate = 0.0
+    reply = None
+    echo = False
+
+    def log_message(self, format, *args):
+        print(f"[fake-groq] {self.address_string()} {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, request, content):
+        """Send the reply as SSE chunks, a few characters at a time"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for i in range(0, len(content), 4):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": content[i:i + 4]},
+                    "finish_reason": None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(0.02)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _reply_for(self, messages):
+        if self.reply is not None:
+            return self.reply
+        # echo the last user message so it's obvious which prompt was answered
+        user_messages = [m.get("content", "") for m in messages if m.get("role") == "user"]
+        last = user_messages[-1] if user_messages else ''
+        if self.echo:
+            # handy for the chunked formatter: row counts match the input
+            return last
+        return f"Fake reply: {last}"
+
+    def do_POST(self):
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if random.random() < self.fail_rate:
+            self._send_json(503, {"error": {"message": "Fake upstream failure", "type": "internal_server_error"}})
+            return
+
+        content = self._reply_for(request.get("messages", []))
+        if request.get("stream"):
+            self._send_stream(request, content)
+            return
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--reply", default=None, help="fixed reply text instead of echoing")
+    parser.add_argument("--echo", action="store_true", help="reply with the user message verbatim")
+    args = parser.parse_args()
+
+    FakeGroqHandler.latency = args.latency
+    FakeGroqHandler.fail_rate = args.fail_rate
+    FakeGroqHandler.reply = args.reply
+    FakeGroqHandler.echo = args.echo
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeGroqHandler)
+    print(f"Fake Groq listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,44 @@
 import os
-from groq import Groq
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from groq_client import APIKeyError, chat_completion
+
+WIB = timezone(timedelta(hours=7))
+
+# "local" formats deterministically in Python; "llm" sends text to Groq (opt-in)
+FORMATTER_MODE = os.environ.get("ATTENDANCE_FORMATTER", "local")
+
+# Statuses recognised in raw text, kept exactly as written
+STATUS_WORDS = {
+    "present", "absent", "excused", "late",
+    "hadir", "izin", "sakit", "alpa", "alfa", "terlambat",
+}
+TIME_REGEX = re.compile(
+    r"^(?:(?P<date>\d{4}-\d{2}-\d{2})[ T])?(?P<hour>\d{1,2})[:.](?P<minute>\d{2})"
+    r"(?:[:.]\d{2}(?:\.\d+)?)?\s*(?P<tz>Z|[+-]\d{2}:?\d{2})?$",
+    re.IGNORECASE
+)
+SEPARATORS = re.compile(r"\s*(?:\||\t|;|,|\s-\s)\s*")
+DATE_TOKEN = re.compile(r"^(?:\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4})$")
+
+# Marks a record that couldn't be read, in place of its formatted row
+INVALID_LINE = "INVALID_LINE"
+
+# LLM mode: records are split so each completion fits its token cap
+MAX_TOKENS = 800
+CHUNK_OUTPUT_TOKENS = 600  # headroom under MAX_TOKENS, the estimate is rough
+CHUNK_MAX_LINES = 40
+CHUNK_RETRIES = 2
+MAX_PARALLEL_CHUNKS = int(os.environ.get("FORMATTER_CONCURRENCY", 4))
+
+# shared across requests so concurrent reports can't stampede Groq
+_chunk_executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL_CHUNKS, thread_name_prefix="formatter")
+
+
+class ChunkFormatError(Exception):
+    """Raised when a chunk comes back with the wrong number of rows"""
+    pass
 
 FORMATTER_PROMPT = """
 You are a data formatting engine.
@@ -15,87 +54,179 @@ Rules:
 - Output must be plain text.
 - Use this exact column order:
   Name | Status | Timestamp | Note
-- Leave the Note column empty.
+- Leave the Note column empty. Ignore any extra fields after the name, status and timestamp.
+- Dates are not part of the name.
 - One record per line.
+- If a single record can't be read, output INVALID_LINE: followed by that record exactly as given, on its line.
 - No markdown.
 - No tables.
 - No emojis.
 - No headings.
 - No extra text before or after the output.
 
-If the input is invalid, output exactly:
+If no record at all can be read, output exactly:
 INVALID_INPUT
 """
 
 
-class APIKeyError(Exception):
-    """Raised when API key is missing or invalid"""
-    pass
+def wib_hhmm(timestamp) -> str:
+    """
+    HH:MM in WIB. Naive datetimes are already WIB (that's how attendance
+    is stored), aware ones get converted.
+    """
+    if timestamp is None:
+        return ""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(WIB)
+    return f"{timestamp.hour:02d}:{timestamp.minute:02d}"
+
+
+def format_line(name, status, time_text) -> str:
+    return f"{name} | {status} | {time_text} |"
 
 
-def get_groq_client():
+def format_attendance_rows(rows):
     """
-    Get Groq client with proper error handling.
-    
-    Raises:
-        APIKeyError: If GROQ_API_KEY is not set in environment
+    Format (name, status, timestamp) rows in the FORMATTER_PROMPT layout,
+    one line at a time so large sessions can be streamed.
+
+    Yields:
+        "Name | Status | HH:MM |" lines (empty Note) without newlines
     """
-    api_key = os.environ.get("GROQ_API_KEY")
-    
-    if not api_key:
-        raise APIKeyError(
-            "GROQ_API_KEY environment variable is not set. "
-            "Please set it in your .env file or environment variables."
-        )
-    
-    if not api_key.strip():
-        raise APIKeyError(
-            "GROQ_API_KEY is empty. Please provide a valid API key."
-        )
-    
-    try:
-        return Groq(api_key=api_key)
-    except Exception as e:
-        raise APIKeyError(f"Failed to initialize Groq client: {str(e)}")
+    # many marks share a minute, convert each distinct value once
+    times = {}
+    for name, status, timestamp in rows:
+        time_text = times.get(timestamp)
+        if time_text is None:
+            time_text = times[timestamp] = wib_hhmm(timestamp)
+        yield format_line(name, status, time_text)
+
+
+def _parse_time(token: str):
+    """HH:MM in WIB for a raw time token, None if it isn't a time"""
+    match = TIME_REGEX.match(token)
+    if not match:
+        return None
+    hour, minute = int(match.group("hour")), int(match.group("minute"))
+    if hour > 23 or minute > 59:
+        return None
+
+    tz = match.group("tz")
+    if not tz:
+        return f"{hour:02d}:{minute:02d}"
+
+    offset = timezone.utc if tz.upper() == "Z" else datetime.strptime(tz.replace(":", ""), "%z").tzinfo
+    day = datetime.strptime(match.group("date"), "%Y-%m-%d") if match.group("date") else datetime(2000, 1, 1)
+    return wib_hhmm(day.replace(hour=hour, minute=minute, tzinfo=offset))
+
+
+def parse_attendance_line(line: str):
+    """
+    Pull name, status and time out of one free-form record such as
+    "Ahmad Fauzi, present, 07:15" or "Siti | hadir | 2026-03-01T00:15Z".
+    The layout is name first, then status and time (either order, the time
+    optionally preceded by its date). Fields after those are ignored, the
+    Note column stays empty like FORMATTER_PROMPT asks; nothing after the
+    status is ever folded into the name.
+
+    Returns:
+        (name, status, time_text, ignored) or None if the line can't be
+        read; ignored holds the dropped trailing fields
+    """
+    fields = [field for field in SEPARATORS.split(line.strip()) if field]
+    if len(fields) < 2:
+        # "Ahmad Fauzi present 07:15"
+        fields = line.split()
+
+    def is_value(field):
+        return field.lower() in STATUS_WORDS or _parse_time(field) is not None or DATE_TOKEN.match(field)
+
+    status = time_text = None
+    i = 0
+    # name: everything up to the first status / time / date field
+    while i < len(fields) and not is_value(fields[i]):
+        i += 1
+    name = " ".join(fields[:i]).strip()
+
+    # status and time, in either order
+    while i < len(fields):
+        field = fields[i]
+        if status is None and field.lower() in STATUS_WORDS:
+            status = field
+        elif time_text is None and (parsed := _parse_time(field)) is not None:
+            time_text = parsed
+        elif DATE_TOKEN.match(field):
+            # "2026-03-01 07:15" split on whitespace: read the pair as one timestamp
+            joined = f"{field} {fields[i + 1]}" if i + 1 < len(fields) else ""
+            if time_text is None and joined and (parsed := _parse_time(joined)) is not None:
+                time_text = parsed
+                i += 1
+            # a lone date adds nothing to HH:MM, skip it
+        else:
+            break
+        i += 1
+
+    if not name or not status:
+        return None
+    return name, status, time_text or "", fields[i:]
+
+
+def format_attendance_local(text_input: str) -> str:
+    """
+    Deterministic formatter for raw attendance text, same output layout as
+    FORMATTER_PROMPT. Never drops or invents a record: a line that can't be
+    read comes out as "INVALID_LINE: <line>" in its place, the rest are
+    still formatted. Only input with nothing readable is INVALID_INPUT.
+    """
+    lines = [line.strip() for line in (text_input or "").splitlines() if line.strip()]
+    if not lines:
+        return "INVALID_INPUT"
 
+    formatted = []
+    readable = ignored = 0
+    for line in lines:
+        parsed = parse_attendance_line(line)
+        if parsed is None:
+            formatted.append(f"{INVALID_LINE}: {line}")
+            continue
+        name, status, time_text, extra = parsed
+        readable += 1
+        ignored += bool(extra)
+        formatted.append(format_line(name, status, time_text))
 
-def format_attendance(text_input: str) -> str:
+    if not readable:
+        return "INVALID_INPUT"
+    if ignored:
+        print(f"Attendance formatter: ignored extra fields on {ignored} of {len(lines)} lines")
+    return "\n".join(formatted)
+
+
+def format_attendance(text_input: str, use_llm: bool = None) -> str:
     """
-    Format attendance records using AI.
+    Format attendance records. Runs locally unless the LLM mode is asked
+    for (use_llm=True or ATTENDANCE_FORMATTER=llm).
     
     Args:
         text_input: Raw attendance data to format
+        use_llm: Force the Groq path on/off, defaults to FORMATTER_MODE
         
     Returns:
         Formatted attendance string or error message
         
     Raises:
-        APIKeyError: If API key is not configured
+        APIKeyError: If API key is not configured (LLM mode only)
     """
     if not text_input or not text_input.strip():
         return "INVALID_INPUT"
-    
+
+    if use_llm is None:
+        use_llm = FORMATTER_MODE == "llm"
+    if not use_llm:
+        return format_attendance_local(text_input)
+
     try:
-        client = get_groq_client()
-        
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": FORMATTER_PROMPT},
-                {"role": "user", "content": text_input}
-            ],
-            temperature=0,
-            max_tokens=800,
-        )
-
-        result = completion.choices[0].message.content.strip()
-        
-        # Validate result
-        if not result:
-            return "FORMATTING_ERROR: Empty response from API"
-        
-        return result
-    
+        return format_attendance_llm(text_input)
+
     except APIKeyError as e:
         # Re-raise API key errors so they can be handled by caller
         raise
@@ -103,4 +234,100 @@ def format_attendance(text_input: str) -> str:
     except Exception as e:
         # Log the error and return a user-friendly message
         print(f"Formatting error: {type(e).__name__}: {e}")
-        return f"FORMATTING_ERROR: {str(e)}"
\ No newline at end of file
+        return f"FORMATTING_ERROR: {str(e)}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token plus separators)"""
+    return len(text) // 4 + 4
+
+
+def chunk_records(lines: list, budget: int = CHUNK_OUTPUT_TOKENS, max_lines: int = CHUNK_MAX_LINES) -> list:
+    """
+    Split records into batches whose formatted output should fit in one
+    completion. Output rows are about as long as input rows, so the input
+    size is used as the estimate.
+
+    Returns:
+        List of line lists, in input order
+    """
+    chunks, current, used = [], [], 0
+    for line in lines:
+        cost = estimate_tokens(line)
+        if current and (used + cost > budget or len(current) >= max_lines):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _format_chunk(lines: list) -> list:
+    """
+    Format one batch with Groq and check nothing was dropped or merged.
+
+    Returns:
+        Formatted rows, one per input line
+
+    Raises:
+        ChunkFormatError: If the row count doesn't match
+    """
+    result = chat_completion(
+        messages=[
+            {"role": "system", "content": FORMATTER_PROMPT},
+            {"role": "user", "content": "\n".join(lines)}
+        ],
+        temperature=0,
+        max_tokens=MAX_TOKENS,
+    )
+    rows = [row.strip() for row in (result or "").splitlines() if row.strip()]
+    if len(rows) != len(lines) or rows == ["INVALID_INPUT"]:
+        raise ChunkFormatError(f"expected {len(lines)} rows, got {len(rows)}")
+    return rows
+
+
+def format_attendance_llm(text_input: str) -> str:
+    """
+    LLM formatting for any session size: records are chunked, formatted in
+    parallel (bounded by MAX_PARALLEL_CHUNKS) and put back in order. Only
+    chunks that fail or come back with the wrong row count are retried;
+    chunks that still fail after CHUNK_RETRIES use the local formatter so
+    no record is ever lost.
+
+    Returns:
+        Formatted attendance string or error message
+
+    Raises:
+        APIKeyError: If API key is not configured
+    """
+    lines = [line.strip() for line in text_input.splitlines() if line.strip()]
+    chunks = chunk_records(lines)
+    results = [None] * len(chunks)
+    pending = list(range(len(chunks)))
+
+    for attempt in range(1 + CHUNK_RETRIES):
+        futures = {i: _chunk_executor.submit(_format_chunk, chunks[i]) for i in pending}
+        failed = []
+        for i, future in futures.items():
+            try:
+                results[i] = future.result()
+            except APIKeyError:
+                raise
+            except Exception as e:
+                print(f"Formatting chunk {i + 1}/{len(chunks)} failed (attempt {attempt + 1}): {type(e).__name__}: {e}")
+                failed.append(i)
+        pending = failed
+        if not pending:
+            break
+
+    for i in pending:
+        local = format_attendance_local("\n".join(chunks[i]))
+        if local == "INVALID_INPUT":
+            # flag the chunk's records, the other chunks are still good
+            results[i] = [f"{INVALID_LINE}: {line}" for line in chunks[i]]
+        else:
+            results[i] = local.splitlines()
+
+    return "\n".join(row for chunk in results for row in chunk)
@@ -0,0 +1,266 @@
+import os
+import random
+import threading
+import time
+import groq
+from groq import Groq
+
+MODEL = "llama-3.1-8b-instant"
+
+# Per-attempt timeout and total budget (seconds) for one logical call,
+# kept well under gunicorn's 30s worker timeout
+CALL_TIMEOUT = float(os.environ.get("GROQ_TIMEOUT", 10))
+CALL_DEADLINE = float(os.environ.get("GROQ_DEADLINE", 20))
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+
+# Errors worth retrying; auth / bad request errors won't fix themselves
+RETRYABLE_ERRORS = (
+    groq.APITimeoutError,
+    groq.APIConnectionError,
+    groq.RateLimitError,
+    groq.InternalServerError,
+)
+
+
+class APIKeyError(Exception):
+    """Raised when API key is missing or invalid"""
+    pass
+
+
+class GroqUnavailableError(Exception):
+    """Raised when Groq is degraded (circuit open or retries exhausted)"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops calling Groq for a while after repeated failures so requests
+    fall back immediately instead of waiting on timeouts.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.reset_timeout:
+                # let a single trial call through
+                self.state = "half_open"
+                self.trial_started = now
+                return True
+            if self.state == "half_open" and now - self.trial_started >= self.reset_timeout:
+                # the trial never reported back, try another one
+                self.trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def release(self):
+        """
+        The call ended without telling us anything about Groq (client went
+        away, bad key, ...). A half-open trial hands its slot to the next call.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+
+breaker = CircuitBreaker()
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """
+    Get the shared Groq client for this worker process.
+    The client keeps its HTTP connection pool alive between calls.
+
+    Raises:
+        APIKeyError: If GROQ_API_KEY is not set in environment
+    """
+    global _client, _client_key
+
+    api_key = os.environ.get("GROQ_API_KEY")
+
+    if not api_key:
+        raise APIKeyError(
+            "GROQ_API_KEY environment variable is not set. "
+            "Please set it in your .env file or environment variables."
+        )
+
+    if not api_key.strip():
+        raise APIKeyError(
+            "GROQ_API_KEY is empty. Please provide a valid API key."
+        )
+
+    with _client_lock:
+        if _client is None or _client_key != api_key:
+            try:
+                # retries are handled here, not by the SDK, so they respect the deadline
+                _client = Groq(api_key=api_key, timeout=CALL_TIMEOUT, max_retries=0)
+                _client_key = api_key
+            except Exception as e:
+                raise APIKeyError(f"Failed to initialize Groq client: {str(e)}")
+        return _client
+
+
+def _backoff(attempt: int, remaining: float) -> float:
+    """Exponential backoff with full jitter, never past the deadline"""
+    return min(remaining, random.uniform(0, BACKOFF_BASE * (2 ** attempt)))
+
+
+def chat_completion(messages: list, temperature: float, max_tokens: int,
+                    model: str = MODEL, deadline: float = CALL_DEADLINE) -> str:
+    """
+    Run a chat completion with bounded retries and a total time budget.
+
+    Args:
+        messages: Chat messages for the model
+        temperature: Sampling temperature
+        max_tokens: Completion token cap
+        model: Groq model name
+        deadline: Total seconds allowed across all attempts
+
+    Returns:
+        Stripped completion text
+
+    Raises:
+        APIKeyError: If API key is not configured
+        GroqUnavailableError: If the circuit is open or every attempt failed
+    """
+    if not breaker.allow():
+        raise GroqUnavailableError("Groq circuit is open, skipping call")
+
+    # every exit path must report to the breaker, or a half-open trial
+    # would hold the circuit shut forever
+    try:
+        client = get_groq_client()
+        start = time.monotonic()
+        last_error = None
+
+        for attempt in range(MAX_ATTEMPTS):
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            try:
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=min(CALL_TIMEOUT, remaining),
+                )
+                breaker.record_success()
+                return (completion.choices[0].message.content or "").strip()
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                breaker.record_failure()
+                if breaker.is_open:
+                    break
+                remaining = deadline - (time.monotonic() - start)
+                if attempt < MAX_ATTEMPTS - 1 and remaining > 0:
+                    time.sleep(_backoff(attempt, remaining))
+            except groq.APIStatusError:
+                # Groq answered (auth / bad request), it isn't down
+                breaker.record_success()
+                raise
+    finally:
+        breaker.release()
+
+    if last_error is None:
+        raise GroqUnavailableError("Groq call deadline exceeded")
+    raise GroqUnavailableError(f"Groq call failed: {type(last_error).__name__}: {last_error}")
+
+
+def chat_completion_stream(messages: list, temperature: float, max_tokens: int,
+                           model: str = MODEL, deadline: float = CALL_DEADLINE):
+    """
+    Streaming version of chat_completion, yields text deltas as they arrive.
+    Retries only happen before the first token; once text has been handed
+    out a failure is raised instead of silently restarting the answer.
+
+    Yields:
+        Completion text chunks
+
+    Raises:
+        APIKeyError: If API key is not configured
+        GroqUnavailableError: If the circuit is open or the stream failed
+    """
+    if not breaker.allow():
+        raise GroqUnavailableError("Groq circuit is open, skipping call")
+
+    # released on every exit, including GeneratorExit when the client disconnects
+    try:
+        client = get_groq_client()
+        start = time.monotonic()
+        last_error = None
+
+        for attempt in range(MAX_ATTEMPTS):
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            started = False
+            try:
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    timeout=min(CALL_TIMEOUT, remaining),
+                )
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not started:
+                            # first token arrived, Groq is up
+                            breaker.record_success()
+                        started = True
+                        yield delta
+                breaker.record_success()
+                return
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                breaker.record_failure()
+                if started or breaker.is_open:
+                    break
+                remaining = deadline - (time.monotonic() - start)
+                if attempt < MAX_ATTEMPTS - 1 and remaining > 0:
+                    time.sleep(_backoff(attempt, remaining))
+            except groq.APIStatusError:
+                breaker.record_success()
+                raise
+    finally:
+        breaker.release()
+
+    if last_error is None:
+        raise GroqUnavailableError("Groq call deadline exceeded")
+    raise GroqUnavailableError(f"Groq stream failed: {type(last_error).__name__}: {last_error}")
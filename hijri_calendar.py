@@ -0,0 +1,159 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from ummalqura.hijri_date import HijriDate
+
+ISLAMIC_HOLIDAYS = {
+    # Muharram
+    "01-01": "Islamic New Year",
+    "01-09": "Day of Tasua",
+    "01-10": "Day of Ashura",
+
+    # Rabi' al-Awwal
+    "03-12": "Mawlid al-Nabi",
+
+    # Rajab
+    "07-01": "Start of Rajab",
+    "07-27": "Isra and Mi'raj",
+
+    # Sha'ban
+    "08-15": "Mid-Sha'ban (Laylat al-Bara'ah)",
+
+    # Ramadan
+    "09-01": "Start of Ramadan",
+    "09-17": "Nuzul al-Qur'an",
+    "09-21": "Laylat al-Qadr (possible)",
+    "09-23": "Laylat al-Qadr (possible)",
+    "09-25": "Laylat al-Qadr (possible)",
+    "09-27": "Laylat al-Qadr (possible)",
+    "09-29": "Laylat al-Qadr (possible)",
+
+    # Shawwal
+    "10-01": "Eid al-Fitr",
+    "10-02": "Eid al-Fitr ",
+
+    # Dhu al-Qi'dah
+    "11-01": "Start of Dhuqa'dah",
+
+    # Dhu al-Hijjah
+    "12-01": "Start of Dhu al-Hijjah",
+    "12-08": "Day of Tarwiyah",
+    "12-09": "Day of Arafah",
+    "12-10": "Eid al-Adha",
+    "12-11": "Days of Tashreeq",
+    "12-12": "Days of Tashreeq",
+    "12-13": "Days of Tashreeq",
+}
+
+
+# Days ummalqura's Umm al-Qura table covers (1356-1500 H); outside it the
+# library raises TypeError or silently returns nonsense
+SUPPORTED_START = date(1937, 3, 14)
+SUPPORTED_END = date(2077, 11, 17)  # exclusive
+
+# Years kept in memory per process, a calendar view touches one or two
+CACHED_YEARS = 16
+
+# Widest window the calendar API will compute holidays for
+MAX_RANGE = timedelta(days=3 * 366)
+
+
+def is_supported(g_date: date) -> bool:
+    return SUPPORTED_START <= g_date < SUPPORTED_END
+
+
+def clamp_range(start: date, end: date, max_range: timedelta = MAX_RANGE) -> tuple:
+    """
+    Limit a requested [start, end) window to the supported Hijri range and
+    at most max_range long.
+
+    Returns:
+        (start, end), empty (start == end) if nothing is left
+    """
+    start = max(start, SUPPORTED_START)
+    end = min(end, SUPPORTED_END)
+    if end - start > max_range:
+        # compared as a span first, start + max_range could overflow date.max
+        end = start + max_range
+    return start, max(start, end)
+
+
+@lru_cache(maxsize=CACHED_YEARS)
+def hijri_year_table(year: int) -> dict:
+    """
+    Gregorian -> Hijri lookup for a whole Gregorian year, built once per process.
+    Days outside the supported range are left out.
+
+    Returns:
+        dict of date -> (hijri_year, hijri_month, hijri_day, month_name)
+    """
+    table = {}
+    current = max(date(year, 1, 1), SUPPORTED_START)
+    while current.year == year and current < SUPPORTED_END:
+        h = HijriDate(current.year, current.month, current.day, gr=True)
+        table[current] = (h.year, h.month, h.day, h.month_name)
+        current += timedelta(days=1)
+    return table
+
+
+@lru_cache(maxsize=CACHED_YEARS)
+def holidays_in_year(year: int) -> tuple:
+    """
+    Holiday index for a Gregorian year, matched by Hijri month-day.
+
+    Returns:
+        tuple of (date, holiday_name, hijri_label) sorted by date
+    """
+    found = []
+    for g_date, (h_year, h_month, h_day, month_name) in hijri_year_table(year).items():
+        name = ISLAMIC_HOLIDAYS.get(f"{h_month:02d}-{h_day:02d}")
+        if name:
+            found.append((g_date, name, f"{h_day} {month_name} {h_year} H"))
+    return tuple(sorted(found))
+
+
+def hijri_label(g_date: date) -> str:
+    """
+    Format a Gregorian date as 'day month_name year H' using the cached table.
+    Returns "" for dates that can't be converted.
+    """
+    if not g_date or not is_supported(g_date):
+        return ""
+    try:
+        h_year, _, h_day, month_name = hijri_year_table(g_date.year)[g_date]
+    except Exception as e:
+        print(f"Hijri conversion failed for {g_date}: {type(e).__name__}: {e}")
+        return ""
+    return f"{h_day} {month_name} {h_year} H"
+
+
+def holidays_between(start: date, end: date) -> list:
+    """
+    Holidays falling in [start, end), clamped with clamp_range.
+
+    Returns:
+        list of (date, holiday_name, hijri_label)
+    """
+    start, end = clamp_range(start, end)
+    if start >= end:
+        return []
+    result = []
+    for year in range(start.year, end.year + 1):
+        for item in holidays_in_year(year):
+            if start <= item[0] < end:
+                result.append(item)
+    return result
+
+
+def parse_range_date(value):
+    """
+    Parse a FullCalendar start/end parameter (ISO date or datetime).
+
+    Returns:
+        date, or None if missing/invalid
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
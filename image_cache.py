@@ -0,0 +1,73 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Roughly enough for a whole roster of avatars without eating worker memory
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Hash image bytes for ETags and versioned URLs.
+
+    Args:
+        data: Raw image bytes
+
+    Returns:
+        Hex digest that changes whenever the image changes
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImageCache:
+    """In-process LRU of hot images, bounded by total bytes instead of item count"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a cached image.
+
+        Returns:
+            (data, mimetype, etag) tuple or None on a miss
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item
+
+    def put(self, key, data: bytes, mimetype: str, etag: str = None):
+        """
+        Store an image, evicting the least recently used ones to stay under budget.
+        etag is the tag the bytes are served with, when it differs from key
+        (e.g. an original standing in for a missing thumbnail).
+        """
+        size = len(data)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old[0])
+
+            self._items[key] = (data, mimetype, etag or key)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _, _) = self._items.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+
+avatar_cache = ImageCache()
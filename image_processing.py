@@ -0,0 +1,80 @@
+from io import BytesIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Square thumbnail sizes (px) generated for every avatar
+THUMBNAIL_SIZES = (64, 128, 256)
+
+# WebP for browsers that accept it, JPEG as the fallback everyone can read
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+
+class InvalidImageError(Exception):
+    """Raised when uploaded bytes are not a readable image"""
+    pass
+
+
+def _to_rgb(img):
+    """Flatten transparency onto white so the JPEG fallback doesn't turn it black"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    return img.convert('RGB')
+
+
+def make_thumbnails(image_data: bytes) -> list:
+    """
+    Build the fixed-size avatar variants for an uploaded image.
+
+    Args:
+        image_data: Raw uploaded image bytes
+
+    Returns:
+        List of (size, format, data) tuples, one per size and format
+
+    Raises:
+        InvalidImageError: If the bytes can't be decoded as an image
+    """
+    try:
+        img = Image.open(BytesIO(image_data))
+        # respect phone camera rotation before cropping
+        img = ImageOps.exif_transpose(img)
+        img = _to_rgb(img)
+    except (UnidentifiedImageError, OSError) as e:
+        raise InvalidImageError(f"Could not read image: {e}")
+    except Image.DecompressionBombError as e:
+        # e.g. a tiny PNG that decodes to gigapixels
+        raise InvalidImageError(f"Image too large: {e}")
+
+    variants = []
+    for size in THUMBNAIL_SIZES:
+        # avatars are shown as circles, center-crop to a square
+        thumb = ImageOps.fit(img, (size, size), Image.LANCZOS)
+        for fmt, (pil_format, _) in VARIANT_FORMATS.items():
+            out = BytesIO()
+            thumb.save(out, format=pil_format, quality=82, optimize=True)
+            variants.append((size, fmt, out.getvalue()))
+    return variants
+
+
+def pick_thumbnail_size(requested) -> int:
+    """
+    Snap a requested size to the smallest generated thumbnail that covers it.
+
+    Returns:
+        One of THUMBNAIL_SIZES, or None if the request is invalid
+    """
+    try:
+        requested = int(requested)
+    except (ValueError, TypeError):
+        return None
+    if requested <= 0:
+        return None
+    for size in THUMBNAIL_SIZES:
+        if size >= requested:
+            return size
+    return THUMBNAIL_SIZES[-1]
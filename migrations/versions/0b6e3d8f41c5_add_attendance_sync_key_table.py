@@ -0,0 +1,31 @@
+"""Add attendance_sync_key table for idempotent offline sync
+
+Revision ID: 0b6e3d8f41c5
+Revises: e92b5d13c7a8
+Create Date: 2026-02-14 16:48:20.337019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6e3d8f41c5'
+down_revision = 'e92b5d13c7a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_sync_key',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('result', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('attendance_sync_key')
@@ -0,0 +1,51 @@
+"""Move profile picture BLOBs to their own table
+
+Revision ID: 3c9a4f2d8e17
+Revises: 75fb618c1be0
+Create Date: 2026-02-02 19:41:05.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a4f2d8e17'
+down_revision = '75fb618c1be0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('profile_picture',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # copy the existing avatars over before the old columns go away
+    op.execute(
+        'INSERT INTO profile_picture (user_id, data, filename) '
+        'SELECT id, profile_picture_data, profile_picture_filename FROM "user" '
+        'WHERE profile_picture_data IS NOT NULL'
+    )
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('profile_picture_filename')
+        batch_op.drop_column('profile_picture_data')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_picture_data', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('profile_picture_filename', sa.String(length=255), nullable=True))
+
+    op.execute(
+        'UPDATE "user" SET '
+        'profile_picture_data = (SELECT data FROM profile_picture WHERE profile_picture.user_id = "user".id), '
+        'profile_picture_filename = (SELECT filename FROM profile_picture WHERE profile_picture.user_id = "user".id)'
+    )
+
+    op.drop_table('profile_picture')
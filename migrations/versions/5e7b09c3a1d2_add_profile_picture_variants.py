@@ -0,0 +1,32 @@
+"""Add profile picture thumbnail variants
+
+Revision ID: 5e7b09c3a1d2
+Revises: a8d21e6b5f40
+Create Date: 2026-02-05 18:27:33.904115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e7b09c3a1d2'
+down_revision = 'a8d21e6b5f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('profile_picture_variant',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'size', 'format')
+    )
+    # existing avatars are filled in by `python pfp_migration.py thumbnails`
+
+
+def downgrade():
+    op.drop_table('profile_picture_variant')
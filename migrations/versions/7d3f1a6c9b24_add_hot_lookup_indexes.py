@@ -0,0 +1,44 @@
+"""Add indexes for hot attendance, user and session lookups
+
+Revision ID: 7d3f1a6c9b24
+Revises: 0b6e3d8f41c5
+Create Date: 2026-02-16 09:21:37.584102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3f1a6c9b24'
+down_revision = '0b6e3d8f41c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_user_id_status', ['user_id', 'status'], unique=False)
+        batch_op.create_index('ix_attendance_session_id_type', ['session_id', 'attendance_type'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_role'), ['role'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_pic_id'), ['pic_id'], unique=False)
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_session_date'), ['date'], unique=False)
+        batch_op.create_index('ix_session_pic_id_date', ['pic_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_pic_id_date')
+        batch_op.drop_index(batch_op.f('ix_session_date'))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_pic_id'))
+        batch_op.drop_index(batch_op.f('ix_user_role'))
+
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_session_id_type')
+        batch_op.drop_index('ix_attendance_user_id_status')
@@ -0,0 +1,95 @@
+"""Convert session.date from string to DATE
+
+Revision ID: 9a5c2e7f3b18
+Revises: 7d3f1a6c9b24
+Create Date: 2026-02-19 14:02:51.730466
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a5c2e7f3b18'
+down_revision = '7d3f1a6c9b24'
+branch_labels = None
+depends_on = None
+
+# The create-session form sends ISO dates, older rows were typed in by hand
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d %B %Y", "%d %b %Y")
+
+
+def parse_session_date(value):
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    # e.g. "2026-01-05T19:00" or "2026-01-05 19:00"
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def upgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('date_value', sa.Date(), nullable=True))
+
+    conn = op.get_bind()
+    session_table = sa.table('session',
+        sa.column('id', sa.Integer),
+        sa.column('date', sa.String),
+        sa.column('date_value', sa.Date),
+    )
+    rows = conn.execute(sa.select(session_table.c.id, session_table.c.date)).fetchall()
+    for session_id, raw in rows:
+        parsed = parse_session_date(raw)
+        if parsed is None and raw:
+            print(f"session {session_id}: could not parse date {raw!r}, leaving it empty")
+        conn.execute(
+            session_table.update()
+            .where(session_table.c.id == session_id)
+            .values(date_value=parsed)
+        )
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_pic_id_date')
+        batch_op.drop_index(batch_op.f('ix_session_date'))
+        batch_op.drop_column('date')
+        batch_op.alter_column('date_value', new_column_name='date')
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_session_date'), ['date'], unique=False)
+        batch_op.create_index('ix_session_pic_id_date', ['pic_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('date_text', sa.String(length=50), nullable=True))
+
+    conn = op.get_bind()
+    session_table = sa.table('session',
+        sa.column('id', sa.Integer),
+        sa.column('date', sa.Date),
+        sa.column('date_text', sa.String),
+    )
+    rows = conn.execute(sa.select(session_table.c.id, session_table.c.date)).fetchall()
+    for session_id, value in rows:
+        conn.execute(
+            session_table.update()
+            .where(session_table.c.id == session_id)
+            .values(date_text=value.isoformat() if value else None)
+        )
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_pic_id_date')
+        batch_op.drop_index(batch_op.f('ix_session_date'))
+        batch_op.drop_column('date')
+        batch_op.alter_column('date_text', new_column_name='date')
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_session_date'), ['date'], unique=False)
+        batch_op.create_index('ix_session_pic_id_date', ['pic_id', 'date'], unique=False)
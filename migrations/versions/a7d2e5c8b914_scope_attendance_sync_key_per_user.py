@@ -0,0 +1,50 @@
+"""Key attendance_sync_key on (user_id, key)
+
+Revision ID: a7d2e5c8b914
+Revises: f3b7c1e9a2d6
+Create Date: 2026-03-09 14:22:51.604187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e5c8b914'
+down_revision = 'f3b7c1e9a2d6'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'key, user_id, result, created_at'
+
+
+def create_sync_key_table(name, primary_key):
+    op.create_table(name,
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('result', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint(*primary_key)
+    )
+
+
+def upgrade():
+    # Copy into a new table instead of swapping the primary key in place:
+    # the old PK is unnamed, so its name differs per database
+    create_sync_key_table('attendance_sync_key_new', ['user_id', 'key'])
+    op.execute(f'INSERT INTO attendance_sync_key_new ({COLUMNS}) SELECT {COLUMNS} FROM attendance_sync_key')
+    op.drop_table('attendance_sync_key')
+    op.rename_table('attendance_sync_key_new', 'attendance_sync_key')
+
+
+def downgrade():
+    create_sync_key_table('attendance_sync_key_old', ['key'])
+    # a key used by more than one member can't survive a key-only PK; those
+    # rows are only retry bookkeeping, so drop them
+    op.execute(
+        f'INSERT INTO attendance_sync_key_old ({COLUMNS}) SELECT {COLUMNS} FROM attendance_sync_key '
+        'WHERE key IN (SELECT key FROM attendance_sync_key GROUP BY key HAVING COUNT(*) = 1)'
+    )
+    op.drop_table('attendance_sync_key')
+    op.rename_table('attendance_sync_key_old', 'attendance_sync_key')
@@ -0,0 +1,37 @@
+"""Add profile picture hash for ETags and versioned URLs
+
+Revision ID: a8d21e6b5f40
+Revises: 3c9a4f2d8e17
+Create Date: 2026-02-03 20:12:47.502931
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d21e6b5f40'
+down_revision = '3c9a4f2d8e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_picture_hash', sa.String(length=64), nullable=True))
+
+    # hash the avatars that are already stored
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT user_id, data FROM profile_picture')).fetchall()
+    for user_id, data in rows:
+        conn.execute(
+            sa.text('UPDATE "user" SET profile_picture_hash = :h WHERE id = :id'),
+            {"h": hashlib.sha256(data).hexdigest(), "id": user_id}
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('profile_picture_hash')
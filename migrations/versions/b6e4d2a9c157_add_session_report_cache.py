@@ -0,0 +1,38 @@
+"""Add session lock_version and session_report cache table
+
+Revision ID: b6e4d2a9c157
+Revises: 9a5c2e7f3b18
+Create Date: 2026-02-21 11:46:09.215873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e4d2a9c157'
+down_revision = '9a5c2e7f3b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lock_version', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('session_report',
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('lock_version', sa.Integer(), nullable=False),
+        sa.Column('etag', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+        sa.PrimaryKeyConstraint('session_id')
+    )
+
+
+def downgrade():
+    op.drop_table('session_report')
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_column('lock_version')
@@ -0,0 +1,28 @@
+"""Add cached summary columns to notulensi
+
+Revision ID: c41f7a9e2b63
+Revises: 5e7b09c3a1d2
+Create Date: 2026-02-08 10:05:12.661830
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7a9e2b63'
+down_revision = '5e7b09c3a1d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notulensi', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('summary', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('summary_key', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notulensi', schema=None) as batch_op:
+        batch_op.drop_column('summary_key')
+        batch_op.drop_column('summary')
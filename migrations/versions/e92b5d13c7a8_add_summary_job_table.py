@@ -0,0 +1,42 @@
+"""Add summary_job table for background summaries
+
+Revision ID: e92b5d13c7a8
+Revises: c41f7a9e2b63
+Create Date: 2026-02-10 21:33:48.120457
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e92b5d13c7a8'
+down_revision = 'c41f7a9e2b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('summary_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('notulensi_id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['notulensi_id'], ['notulensi.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('summary_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_summary_job_cache_key'), ['cache_key'], unique=False)
+        batch_op.create_index(batch_op.f('ix_summary_job_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('summary_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_summary_job_status'))
+        batch_op.drop_index(batch_op.f('ix_summary_job_cache_key'))
+
+    op.drop_table('summary_job')
@@ -0,0 +1,86 @@
+"""Add plain text and excerpt columns to notulensi
+
+Revision ID: f3b7c1e9a2d6
+Revises: d2a8f6c4e391
+Create Date: 2026-03-04 09:41:27.318054
+
+"""
+import re
+from html import unescape
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7c1e9a2d6'
+down_revision = 'd2a8f6c4e391'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 200
+EXCERPT_CHARS = 300
+FALLBACK_EXCERPT = "Meeting notes available."
+
+# Frozen copy of summarizer.clean_html as of this revision, so the migration
+# doesn't depend on (or import the groq SDK through) live app code
+BLOCK_TAGS = re.compile(r'<\s*(?:br|/p|/div|/li|/h[1-6]|/tr|/blockquote)\b[^>]*>', re.IGNORECASE)
+
+
+def clean_html(content):
+    clean_text = BLOCK_TAGS.sub('\n', content or '')
+    clean_text = re.sub('<[^<]+?>', '', clean_text)
+    clean_text = unescape(clean_text)
+    clean_text = re.sub(r'[ \t\xa0]+', ' ', clean_text)
+    return re.sub(r'\s*\n\s*', '\n', clean_text).strip()
+
+
+def lead_excerpt(plain_text):
+    """
+    Opening of the note up to EXCERPT_CHARS, cut at a word. Saving a note
+    replaces it with the app's ranked excerpt.
+    """
+    text = " ".join(plain_text.split())
+    if not text:
+        return FALLBACK_EXCERPT
+    if len(text) <= EXCERPT_CHARS:
+        return text
+    cut = text[:EXCERPT_CHARS - 3].rsplit(' ', 1)[0] or text[:EXCERPT_CHARS - 3]
+    return cut + "..."
+
+
+def upgrade():
+    with op.batch_alter_table('notulensi', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('plain_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=300), nullable=True))
+
+    conn = op.get_bind()
+    notulensi_table = sa.table('notulensi',
+        sa.column('id', sa.Integer),
+        sa.column('content', sa.Text),
+        sa.column('plain_text', sa.Text),
+        sa.column('excerpt', sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(notulensi_table.c.id, notulensi_table.c.content)
+            .where(notulensi_table.c.id > last_id)
+            .order_by(notulensi_table.c.id)
+            .limit(BACKFILL_BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        for note_id, content in rows:
+            plain_text = clean_html(content)
+            conn.execute(
+                notulensi_table.update()
+                .where(notulensi_table.c.id == note_id)
+                .values(plain_text=plain_text, excerpt=lead_excerpt(plain_text))
+            )
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('notulensi', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
+        batch_op.drop_column('plain_text')
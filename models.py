@@ -9,21 +9,46 @@ class User(db.Model, UserMixin):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     name = db.Column(db.String(150), nullable=False)
-    role = db.Column(db.String(50), nullable=False) 
+    role = db.Column(db.String(50), nullable=False, index=True)
     must_change_password = db.Column(db.Boolean, default=True)  # Force change
     class_name = db.Column(db.String(50))
     profile_picture = db.Column(db.String(255), default='default.png')
-    profile_picture_data = db.Column(db.LargeBinary, nullable=True)  # Store image as BLOB
-    profile_picture_filename = db.Column(db.String(255), default='default.png')  # Store filename for reference
-    pic_id = db.Column(db.Integer, db.ForeignKey('pic.id', name='fk_user_pic'), nullable=True)
+    profile_picture_hash = db.Column(db.String(64), nullable=True)  # Version for avatar URLs/ETags
+    pic_id = db.Column(db.Integer, db.ForeignKey('pic.id', name='fk_user_pic'), nullable=True, index=True)
     division_id = db.Column(db.Integer, db.ForeignKey('division.id'), nullable=True)
     can_mark_attendance = db.Column(db.Boolean, default=False)  # New field
+
+# Avatar bytes live in their own table so listing users never pulls the BLOBs
+class ProfilePicture(db.Model):
+    __tablename__ = 'profile_picture'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    filename = db.Column(db.String(255), default='default.png')
+
+    user = db.relationship('User', backref=db.backref('profile_picture_blob', uselist=False, lazy=True, cascade='all, delete-orphan'))
+
+# Resized thumbnails made at upload time, one row per size + format
+class ProfilePictureVariant(db.Model):
+    __tablename__ = 'profile_picture_variant'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    size = db.Column(db.Integer, primary_key=True)
+    format = db.Column(db.String(10), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    user = db.relationship('User', backref=db.backref('profile_picture_variants', lazy=True, cascade='all, delete-orphan'))
+
 class Session(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150))
-    date = db.Column(db.String(50))
+    date = db.Column(db.Date, index=True)
     pic_id = db.Column(db.Integer, db.ForeignKey('pic.id'))
     is_locked = db.Column(db.Boolean, default=False)
+    lock_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on every lock/unlock
+
+    __table_args__ = (
+        # PIC session pickers, already in date order
+        db.Index('ix_session_pic_id_date', 'pic_id', 'date'),
+    )
 
 class Attendance(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -38,8 +63,32 @@ class Attendance(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('session_id', 'user_id', name='unique_session_user'),
+        # history pages and per-member status counts
+        db.Index('ix_attendance_user_id_status', 'user_id', 'status'),
+        # attendance map / core checks filter on both
+        db.Index('ix_attendance_session_id_type', 'session_id', 'attendance_type'),
     )
 
+# Client idempotency keys for offline attendance sync, so retries never double-apply
+class AttendanceSyncKey(db.Model):
+    __tablename__ = 'attendance_sync_key'
+    # keys are only unique per submitter, another member's key is a different mark
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    key = db.Column(db.String(64), primary_key=True)
+    result = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Generated DOCX report of a locked session, reused while its inputs (etag) are unchanged
+class SessionReport(db.Model):
+    __tablename__ = 'session_report'
+    session_id = db.Column(db.Integer, db.ForeignKey('session.id'), primary_key=True)
+    lock_version = db.Column(db.Integer, nullable=False)
+    etag = db.Column(db.String(64), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    session = db.relationship('Session', backref=db.backref('report', uselist=False, lazy=True, cascade='all, delete-orphan'))
+
 class Pic(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), unique=True, nullable=False)
@@ -56,5 +105,40 @@ class Notulensi(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    summary = db.Column(db.Text, nullable=True)  # AI summary, reused until content changes
+    summary_key = db.Column(db.String(100), nullable=True)  # get_summary_cache_key() of the summarized content
+    plain_text = db.Column(db.Text, nullable=True)  # content without HTML, set with content
+    excerpt = db.Column(db.String(300), nullable=True)  # offline summary of plain_text for list / feed cards
 
     session = db.relationship("Session", backref="notulensi")
+
+# Background summary work, kept in the DB so pending jobs survive restarts
+class SummaryJob(db.Model):
+    __tablename__ = 'summary_job'
+    id = db.Column(db.Integer, primary_key=True)
+    notulensi_id = db.Column(db.Integer, db.ForeignKey('notulensi.id'), nullable=False)
+    cache_key = db.Column(db.String(100), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending | running | done | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    notulensi = db.relationship('Notulensi', backref=db.backref('summary_jobs', lazy=True, cascade='all, delete-orphan'))
+
+# Background multi-session (term) report exports
+class ReportJob(db.Model):
+    __tablename__ = 'report_job'
+    id = db.Column(db.Integer, primary_key=True)
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)  # exclusive
+    title = db.Column(db.String(150), nullable=False)
+    format = db.Column(db.String(10), nullable=False)  # xlsx | docx | zip
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending | running | done | failed
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    data = db.Column(db.LargeBinary, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
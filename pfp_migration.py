@@ -4,11 +4,13 @@ Database Migration: Store Profile Pictures as BLOB
 Add this as a new migration file or run manually to update the User model
 """
 
-from app import app, db
-from models import User
+from app import app, db, replace_profile_picture_variants
+from models import User, ProfilePicture
 from flask_migrate import Migrate
 import os
 import base64
+from image_cache import content_hash
+from image_processing import make_thumbnails, InvalidImageError
 
 # Step 1: Update models.py - Add this to User model:
 """
@@ -53,8 +55,11 @@ def migrate_existing_pictures():
                     with open(filepath, 'rb') as f:
                         image_data = f.read()
                     
-                    user.profile_picture_data = image_data
-                    user.profile_picture_filename = filename
+                    pfp = user.profile_picture_blob or ProfilePicture(user_id=user.id)
+                    pfp.data = image_data
+                    pfp.filename = filename
+                    user.profile_picture_hash = content_hash(image_data)
+                    db.session.add(pfp)
                     migrated += 1
                     print(f"✓ Migrated {user.name}: {filename}")
                 else:
@@ -72,6 +77,47 @@ def migrate_existing_pictures():
         print(f"Errors: {errors}")
         print(f"{'='*50}")
 
+def backfill_thumbnails(batch_size=50):
+    """
+    Generate thumbnail variants for avatars uploaded before the resize pipeline.
+    Works in batches so only a handful of BLOBs are in memory at once.
+    """
+    with app.app_context():
+        last_id = 0
+        processed = 0
+        errors = 0
+
+        while True:
+            batch = (
+                ProfilePicture.query
+                .filter(ProfilePicture.user_id > last_id)
+                .order_by(ProfilePicture.user_id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+
+            for pfp in batch:
+                try:
+                    replace_profile_picture_variants(pfp.user_id, make_thumbnails(pfp.data))
+                    processed += 1
+                except InvalidImageError as e:
+                    print(f"✗ Skipped user {pfp.user_id}: {e}")
+                    errors += 1
+
+            last_id = batch[-1].user_id
+            db.session.commit()
+            # drop the processed BLOBs before loading the next batch
+            db.session.expunge_all()
+            print(f"✓ Processed up to user {last_id}")
+
+        print(f"\n{'='*50}")
+        print(f"Thumbnail backfill complete!")
+        print(f"Processed: {processed}")
+        print(f"Errors: {errors}")
+        print(f"{'='*50}")
+
 # Step 3: Updated routes for app.py
 """
 # Update the upload_pfp route:
@@ -148,5 +194,8 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1 and sys.argv[1] == "migrate":
         migrate_existing_pictures()
+    elif len(sys.argv) > 1 and sys.argv[1] == "thumbnails":
+        batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+        backfill_thumbnails(batch_size)
     else:
         create_migration()
\ No newline at end of file
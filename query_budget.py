@@ -0,0 +1,61 @@
+import logging
+from functools import wraps
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# view function name -> max SQL statements for one request
+BUDGETS = {}
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request runs more queries than its budget"""
+    pass
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g._query_count = g.get("_query_count", 0) + 1
+
+
+def limit(max_queries: int):
+    """
+    Cap the number of SQL statements a route may run per request, counting
+    everything from the user loader to template rendering. Catches N+1
+    regressions (a lazy load per row) as soon as the page has real data.
+
+    Args:
+        max_queries: Budget for one request, independent of row count
+    """
+    def decorator(view):
+        BUDGETS[view.__name__] = max_queries
+
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            g._query_budget = max_queries
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def init_app(app):
+    """
+    Report query counts in an X-Query-Count header and warn on budget
+    overruns. With QUERY_BUDGET_STRICT set, overruns raise instead so test
+    clients and check_query_budget.py fail loudly.
+    """
+    @app.after_request
+    def check_query_budget(response):
+        count = g.get("_query_count", 0)
+        budget = g.get("_query_budget")
+        response.headers["X-Query-Count"] = str(count)
+
+        if budget is not None and count > budget:
+            message = f"{request.endpoint} ran {count} queries (budget {budget})"
+            if app.config.get("QUERY_BUDGET_STRICT"):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,150 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from models import db, ReportJob
+from term_report import build_term_report
+
+# Reports are CPU/DB heavy, one at a time per worker process is enough
+MAX_WORKERS = 1
+
+# A job still "running" after this long belongs to a worker that died
+STALE_AFTER = timedelta(minutes=30)
+
+# Finished reports are kept this long for downloading
+KEEP_RESULTS = timedelta(days=7)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="report")
+_app = None
+_resumed = False
+_resume_lock = threading.Lock()
+
+
+def init_app(app):
+    """
+    Attach the queue to the Flask app. Resuming jobs left over from a
+    previous run and pruning old results wait for the first request, so
+    scripts and migrations that import the app leave the queue alone.
+    """
+    global _app
+    _app = app
+
+    @app.before_request
+    def _resume_once():
+        global _resumed
+        if _resumed:
+            return
+        with _resume_lock:
+            if _resumed:
+                return
+            _resumed = True
+        _executor.submit(_resume_pending)
+
+
+def enqueue_report(user_id, start, end, fmt, title) -> ReportJob:
+    """
+    Queue a term report for background generation.
+
+    Args:
+        user_id: Who asked for it (only they and admins can download it)
+        start: First day included
+        end: First day excluded
+        fmt: 'xlsx', 'docx' or 'zip'
+        title: Report heading
+
+    Returns:
+        The committed ReportJob
+    """
+    job = ReportJob(
+        requested_by=user_id,
+        start_date=start,
+        end_date=end,
+        format=fmt,
+        title=title
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _executor.submit(_run_job, job.id)
+    return job
+
+
+def _resume_pending():
+    try:
+        with _app.app_context():
+            now = datetime.utcnow()
+            ReportJob.query.filter(
+                ReportJob.status == 'running',
+                ReportJob.updated_at < now - STALE_AFTER
+            ).update({"status": "pending", "progress": 0}, synchronize_session=False)
+            ReportJob.query.filter(
+                ReportJob.status.in_(['done', 'failed']),
+                ReportJob.updated_at < now - KEEP_RESULTS
+            ).delete(synchronize_session=False)
+            db.session.commit()
+
+            job_ids = [
+                job_id for (job_id,) in
+                db.session.query(ReportJob.id).filter_by(status='pending').all()
+            ]
+        for job_id in job_ids:
+            _executor.submit(_run_job, job_id)
+    except Exception as e:
+        # e.g. table not created yet while running migrations
+        print(f"Report queue resume skipped: {type(e).__name__}: {e}")
+
+
+def _claim(job_id) -> bool:
+    """Mark a pending job as running, only one worker process can win"""
+    claimed = ReportJob.query.filter_by(id=job_id, status='pending').update({
+        "status": "running",
+        "progress": 0,
+        "attempts": ReportJob.attempts + 1,
+        "updated_at": datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def _progress_updater(job_id):
+    """Callback for build_term_report, writes at most one UPDATE per percent"""
+    last = {"percent": -1}
+
+    def update(done):
+        percent = min(99, int(done * 100))
+        if percent <= last["percent"]:
+            return
+        last["percent"] = percent
+        ReportJob.query.filter_by(id=job_id).update({
+            "progress": percent,
+            "updated_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+    return update
+
+
+def _run_job(job_id):
+    with _app.app_context():
+        try:
+            if not _claim(job_id):
+                return
+
+            job = db.session.get(ReportJob, job_id)
+            data = build_term_report(
+                job.start_date, job.end_date, job.format, job.title,
+                progress=_progress_updater(job_id)
+            )
+
+            job = db.session.get(ReportJob, job_id)
+            job.data = data
+            job.progress = 100
+            job.status = 'done'
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Report job {job_id} error: {type(e).__name__}: {e}")
+            ReportJob.query.filter_by(id=job_id).update({
+                "status": "failed",
+                "error": str(e)
+            }, synchronize_session=False)
+            db.session.commit()
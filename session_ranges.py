@@ -0,0 +1,75 @@
+import re
+from datetime import date
+from models import Session
+
+TERM_REGEX = re.compile(r"^(\d{4})-([12])$")
+
+
+def month_bounds(year: int, month: int) -> tuple:
+    """
+    First day of a month and first day of the next one (end exclusive).
+    """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def term_bounds(year: int, term: int) -> tuple:
+    """
+    Date range of a school term. Term 1 (ganjil) runs July-December of
+    `year`, term 2 (genap) January-June of the following year.
+
+    Args:
+        year: First calendar year of the school year (2025 for 2025/2026)
+        term: 1 or 2
+
+    Returns:
+        (start, end) with end exclusive
+    """
+    if term == 1:
+        return date(year, 7, 1), date(year + 1, 1, 1)
+    if term == 2:
+        return date(year + 1, 1, 1), date(year + 1, 7, 1)
+    raise ValueError(f"term must be 1 or 2, got {term}")
+
+
+def term_for(day: date) -> tuple:
+    """(year, term) of the school term containing a date"""
+    if day.month >= 7:
+        return day.year, 1
+    return day.year - 1, 2
+
+
+def parse_term(value):
+    """Parse '2025-1' style term keys, None if invalid"""
+    match = TERM_REGEX.match(value or "")
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def sessions_between(start: date, end: date, pic_id=None):
+    """
+    Sessions with start <= date < end, in date order. A plain range on the
+    indexed date column, so it never scans the whole table.
+
+    Args:
+        start: First day included
+        end: First day excluded
+        pic_id: Only sessions of this PIC
+
+    Returns:
+        Query, so callers can add options or limits
+    """
+    query = Session.query.filter(Session.date >= start, Session.date < end)
+    if pic_id is not None:
+        query = query.filter(Session.pic_id == pic_id)
+    return query.order_by(Session.date.asc(), Session.id.asc())
+
+
+def sessions_in_month(year: int, month: int, pic_id=None):
+    return sessions_between(*month_bounds(year, month), pic_id=pic_id)
+
+
+def sessions_in_term(year: int, term: int, pic_id=None):
+    return sessions_between(*term_bounds(year, term), pic_id=pic_id)
@@ -66,6 +66,7 @@ document.addEventListener("DOMContentLoaded", () => {
                 
                 downloadLink.style.pointerEvents = "auto";
                 downloadLink.style.opacity = "1";
+                enableExportLinks(sessionId);
                 
                 console.log("Download link enabled");
                 
@@ -136,76 +137,151 @@ document.addEventListener("DOMContentLoaded", () => {
     }
 
     // Attendance button handlers
-    document.querySelectorAll(".att-btn").forEach(btn => {
-        btn.addEventListener("click", async () => {
-            if (btn.disabled) return;
-
-            const userId = btn.dataset.userId;
-            const status = btn.dataset.status;
-            const sessionId = sessionSelect ? sessionSelect.value : null;
+    // Every click is stored in an IndexedDB queue with its own idempotency key
+    // and flushed to /api/attendance/sync in batches. With no connection the
+    // marks simply wait in the queue until the browser comes back online;
+    // retries are safe because the server remembers every key it applied.
+    const attendanceType = document.querySelector('[data-attendance-type="core"]') ? "core" : "regular";
+    const pendingButtons = new Map();
+    const FLUSH_DELAY_MS = 400;
+    const SYNC_BATCH_SIZE = 100;
+    let flushTimer = null;
+    let flushing = false;
+    let flushAgain = false;
 
-            if (!sessionId) {
-                alert("Select a session first.");
-                return;
-            }
-
-            btn.disabled = true;
-            btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+    function scheduleFlush() {
+        clearTimeout(flushTimer);
+        flushTimer = setTimeout(flushQueue, FLUSH_DELAY_MS);
+    }
 
-            try {
-                const endpoint = document.querySelector('[data-attendance-type="core"]') 
-                    ? "/api/attendance/core" 
-                    : "/api/attendance";
+    async function flushQueue() {
+        if (flushing) {
+            // Marks clicked mid-sync: go round again once this one finishes
+            flushAgain = true;
+            return;
+        }
+        if (!navigator.onLine) {
+            markQueuedOffline();
+            return;
+        }
+        flushing = true;
+        flushAgain = false;
+        let synced = false;
 
-                const res = await fetch(endpoint, {
+        try {
+            const queued = await offlineQueue.all();
+            for (let i = 0; i < queued.length; i += SYNC_BATCH_SIZE) {
+                const batch = queued.slice(i, i + SYNC_BATCH_SIZE);
+                const res = await fetch("/api/attendance/sync", {
                     method: "POST",
                     headers: {
                         "Content-Type": "application/json"
                     },
-                    body: JSON.stringify({
-                        user_id: userId,
-                        session_id: sessionId,
-                        status: status
-                    })
+                    body: JSON.stringify({ marks: batch })
                 });
 
-                const data = await res.json();
-
-                if (res.ok && data.success) {
-                    lockRow(userId, status);
-                    btn.innerHTML = '<i class="fas fa-check"></i>';
-                    setTimeout(() => {
-                        btn.innerHTML = getButtonIcon(status);
-                    }, 1000);
+                if (!res.ok) {
+                    // Server problem, keep everything queued and retry later
+                    console.error("Attendance sync failed:", res.status);
+                    markQueuedOffline();
                     return;
                 }
 
-                if (data.error === "already_marked") {
-                    lockRow(userId, status);
-                    btn.innerHTML = '<i class="fas fa-check"></i>';
-                    alert("This attendance was already marked.");
-                    return;
-                }
+                const data = await res.json();
+                await offlineQueue.remove(data.results.map(item => item.key));
+                showSyncResults(batch, data.results);
+            }
+            synced = true;
+        } catch (err) {
+            // Network error: marks stay in the queue until we're back online
+            console.warn("Attendance saved offline, will sync later:", err);
+            markQueuedOffline();
+        } finally {
+            flushing = false;
+            // After a failure the online event / next click retries instead
+            if (synced && flushAgain) scheduleFlush();
+        }
+    }
+
+    function showSyncResults(batch, results) {
+        const byKey = new Map(batch.map(mark => [mark.key, mark]));
+        let alreadyMarked = 0;
+
+        results.forEach(item => {
+            const mark = byKey.get(item.key);
+            const pending = pendingButtons.get(item.key);
+            pendingButtons.delete(item.key);
+            if (!mark || !pending) return;
 
-                if (data.error === "session_locked") {
+            if (item.result === "created" || item.result === "already_marked") {
+                lockRow(mark.user_id, mark.status);
+                pending.btn.innerHTML = '<i class="fas fa-check"></i>';
+                setTimeout(() => {
+                    pending.btn.innerHTML = getButtonIcon(mark.status);
+                }, 1000);
+                if (item.result === "already_marked") alreadyMarked++;
+            } else {
+                unlockRow(mark.user_id);
+                pending.btn.innerHTML = getButtonIcon(mark.status);
+                if (item.result === "session_locked") {
                     alert("This session is locked.");
-                } else if (data.error === "forbidden") {
+                } else if (item.result === "forbidden") {
                     alert("You do not have permission to mark attendance.");
                 } else {
-                    alert("Failed to save attendance: " + (data.error || "Unknown error"));
+                    alert("Failed to save attendance: " + item.result);
                 }
+            }
+        });
 
-                btn.disabled = false;
-                btn.innerHTML = getButtonIcon(status);
+        if (alreadyMarked > 0) {
+            alert(alreadyMarked === 1
+                ? "This attendance was already marked."
+                : `${alreadyMarked} attendances were already marked.`);
+        }
+    }
 
-            } catch (err) {
-                console.error("Attendance error:", err);
-                btn.disabled = false;
-                btn.innerHTML = getButtonIcon(status);
-                alert("Network error. Please try again.");
+    function markQueuedOffline() {
+        pendingButtons.forEach(pending => {
+            pending.btn.innerHTML = '<i class="fas fa-cloud-upload-alt"></i>';
+            pending.btn.title = "Saved offline, will sync when the connection returns";
+        });
+    }
+
+    document.querySelectorAll(".att-btn").forEach(btn => {
+        btn.addEventListener("click", async () => {
+            if (btn.disabled) return;
+
+            const userId = btn.dataset.userId;
+            const status = btn.dataset.status;
+            const sessionId = sessionSelect ? sessionSelect.value : null;
+
+            if (!sessionId) {
+                alert("Select a session first.");
+                return;
             }
+
+            const mark = {
+                key: newIdempotencyKey(),
+                session_id: sessionId,
+                user_id: userId,
+                status: status,
+                attendance_type: attendanceType,
+                captured_at: new Date().toISOString()
+            };
+
+            // Lock the row right away, the mark is safe in the queue
+            lockRow(userId, status);
+            btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+            pendingButtons.set(mark.key, { btn });
+
+            await offlineQueue.add(mark);
+            scheduleFlush();
         });
     });
+
+    window.addEventListener("online", flushQueue);
+    // Anything left over from an earlier offline visit
+    flushQueue();
     
     // Initialize on page load if session is already selected
     if (sessionSelect && sessionSelect.value) {
@@ -219,6 +295,7 @@ document.addEventListener("DOMContentLoaded", () => {
             downloadLink.classList.remove("disabled");
             downloadLink.style.pointerEvents = "auto";
             downloadLink.style.opacity = "1";
+            enableExportLinks(sessionId);
         }
     }
 });
@@ -247,4 +324,75 @@ function lockRow(userId, activeStatus) {
             btn.classList.add("btn-secondary");
         }
     });
-}
\ No newline at end of file
+}
+
+function unlockRow(userId) {
+    document.querySelectorAll(`[data-user-id="${userId}"]`).forEach(btn => {
+        btn.disabled = false;
+        btn.classList.remove("btn-secondary");
+    });
+}
+
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return Date.now().toString(36) + "-" + Math.random().toString(36).slice(2, 12);
+}
+
+// Small IndexedDB-backed queue of unsynced attendance marks.
+// Falls back to memory if IndexedDB isn't available (private mode etc.).
+const offlineQueue = (() => {
+    const DB_NAME = "rohis-attendance";
+    const STORE = "marks";
+    let memory = [];
+    let dbPromise = null;
+
+    function open() {
+        if (!window.indexedDB) return Promise.resolve(null);
+        if (!dbPromise) {
+            dbPromise = new Promise(resolve => {
+                const req = indexedDB.open(DB_NAME, 1);
+                req.onupgradeneeded = () => req.result.createObjectStore(STORE, { keyPath: "key" });
+                req.onsuccess = () => resolve(req.result);
+                req.onerror = () => resolve(null);
+            });
+        }
+        return dbPromise;
+    }
+
+    function run(mode, work) {
+        return open().then(db => new Promise((resolve, reject) => {
+            const tx = db.transaction(STORE, mode);
+            const result = work(tx.objectStore(STORE));
+            tx.oncomplete = () => resolve(result && result.result);
+            tx.onerror = () => reject(tx.error);
+        }));
+    }
+
+    return {
+        async add(mark) {
+            if (!(await open())) { memory.push(mark); return; }
+            await run("readwrite", store => { store.put(mark); });
+        },
+        async all() {
+            if (!(await open())) return memory.slice();
+            return (await run("readonly", store => store.getAll())) || [];
+        },
+        async remove(keys) {
+            if (!(await open())) {
+                memory = memory.filter(mark => !keys.includes(mark.key));
+                return;
+            }
+            await run("readwrite", store => { keys.forEach(key => store.delete(key)); });
+        }
+    };
+})();
+
+// Streaming CSV / Excel exports next to the DOCX report
+function enableExportLinks(sessionId) {
+    document.querySelectorAll(".export-link").forEach(link => {
+        link.href = `/export/attendance/${sessionId}/${link.dataset.exportFormat}`;
+        link.classList.remove("disabled");
+        link.style.pointerEvents = "auto";
+        link.style.opacity = "1";
+    });
+}
@@ -54,6 +54,82 @@ document.addEventListener("DOMContentLoaded", () => {
 
   sendBtn.addEventListener("click", sendMessage);
 
+  // Show the final reply object from the server (same shape for JSON and streaming)
+  function handleReply(reply, bubble) {
+    // Check if it's a navigation response
+    if (reply?.action === "navigate" && reply.redirect) {
+      showBotText(bubble, "Taking you there...");
+      setTimeout(() => {
+        window.location.href = reply.redirect;
+      }, 700);
+    }
+    // Check if it's a chat response
+    else if (reply?.action === "chat" && reply.message) {
+      showBotText(bubble, reply.message);
+    }
+    // Fallback for unexpected format
+    else {
+      console.warn("Unexpected reply format:", reply);
+      showBotText(bubble, "I'm not sure how to help with that.");
+    }
+  }
+
+  function showBotText(bubble, text) {
+    if (bubble) {
+      bubble.textContent = text;
+      messages.scrollTop = messages.scrollHeight;
+    } else {
+      addMessage("bot", text);
+    }
+  }
+
+  // Parse one SSE frame ("event: x\ndata: {...}")
+  function parseEvent(frame) {
+    let event = "message";
+    let data = "";
+    frame.split("\n").forEach(line => {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) data += line.slice(5).trim();
+    });
+    return { event, data: data ? JSON.parse(data) : null };
+  }
+
+  async function readStream(res) {
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let bubble = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let split;
+      while ((split = buffer.indexOf("\n\n")) !== -1) {
+        const frame = buffer.slice(0, split);
+        buffer = buffer.slice(split + 2);
+        const { event, data } = parseEvent(frame);
+
+        if (event === "token") {
+          // Render tokens as they come in
+          if (!bubble) {
+            addMessage("bot", "");
+            bubble = messages.lastElementChild;
+          }
+          bubble.textContent += data.text;
+          messages.scrollTop = messages.scrollHeight;
+        } else if (event === "done") {
+          handleReply(data.reply, bubble);
+          return;
+        }
+      }
+    }
+
+    // Stream ended without a final event
+    if (!bubble) addMessage("bot", "I'm not sure how to help with that.");
+  }
+
   function sendMessage() {
     if (isSending) return;
 
@@ -68,41 +144,27 @@ document.addEventListener("DOMContentLoaded", () => {
     fetch("/chat", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ message: text })
+      body: JSON.stringify({ message: text, stream: true })
     })
       .then(res => {
         if (!res.ok) throw new Error("Server error");
-        return res.json();
-      })
-      .then(data => {
-        console.log("Received data:", data); // Debug log
-        
-        // Handle the response based on the actual structure from ai.py
-        if (data?.reply) {
-          const reply = data.reply;
-          
-          // Check if it's a navigation response
-          if (reply.action === "navigate" && reply.redirect) {
-            addMessage("bot", "Taking you there...");
-            setTimeout(() => {
-              window.location.href = reply.redirect;
-            }, 700);
-          } 
-          // Check if it's a chat response
-          else if (reply.action === "chat" && reply.message) {
-            addMessage("bot", reply.message);
-          } 
-          // Fallback for unexpected format
-          else {
-            console.warn("Unexpected reply format:", reply);
+
+        const contentType = res.headers.get("Content-Type") || "";
+        if (contentType.includes("text/event-stream") && res.body) {
+          return readStream(res);
+        }
+
+        // Plain JSON (e.g. empty message)
+        return res.json().then(data => {
+          if (typeof data?.reply === "string") {
+            addMessage("bot", data.reply);
+          } else if (data?.reply) {
+            handleReply(data.reply, null);
+          } else {
+            console.warn("No reply in response:", data);
             addMessage("bot", "I'm not sure how to help with that.");
           }
-        } 
-        // Fallback if no reply object
-        else {
-          console.warn("No reply in response:", data);
-          addMessage("bot", "I'm not sure how to help with that.");
-        }
+        });
       })
       .catch(err => {
         console.error("Chat error:", err);
@@ -113,4 +175,4 @@ document.addEventListener("DOMContentLoaded", () => {
         sendBtn.disabled = false;
       });
   }
-});
\ No newline at end of file
+});
@@ -0,0 +1,78 @@
+// Term report: queue the export, poll its progress, then download it
+document.addEventListener("DOMContentLoaded", () => {
+    const form = document.getElementById("term-report-form");
+    if (!form) return;
+
+    const statusBox = document.getElementById("term-report-status");
+    const bar = statusBox.querySelector(".progress-bar");
+    const message = document.getElementById("term-report-message");
+    const button = form.querySelector("button");
+    const POLL_MS = 1000;
+
+    function showProgress(job) {
+        statusBox.style.display = "block";
+        bar.style.width = `${job.progress}%`;
+        message.textContent = job.status === "pending"
+            ? "Waiting for a worker..."
+            : `Building report... ${job.progress}%`;
+    }
+
+    async function poll(statusUrl) {
+        try {
+            const res = await fetch(statusUrl);
+            const job = await res.json();
+
+            if (job.status === "done") {
+                bar.style.width = "100%";
+                message.innerHTML = `Ready: <a href="${job.download_url}">download ${job.title}</a>`;
+                button.disabled = false;
+                window.location.href = job.download_url;
+                return;
+            }
+            if (job.status === "failed") {
+                message.textContent = `Report failed: ${job.error || "unknown error"}`;
+                button.disabled = false;
+                return;
+            }
+
+            showProgress(job);
+            setTimeout(() => poll(statusUrl), POLL_MS);
+        } catch (err) {
+            console.error("Report status error:", err);
+            // keep polling, the job runs server-side regardless
+            setTimeout(() => poll(statusUrl), POLL_MS * 3);
+        }
+    }
+
+    form.addEventListener("submit", async (event) => {
+        event.preventDefault();
+        button.disabled = true;
+
+        try {
+            const res = await fetch("/api/reports/term", {
+                method: "POST",
+                headers: {
+                    "Content-Type": "application/json"
+                },
+                body: JSON.stringify({
+                    term: document.getElementById("term-report-term").value,
+                    format: document.getElementById("term-report-format").value
+                })
+            });
+            const job = await res.json();
+
+            if (!res.ok) {
+                alert(job.message || "Failed to start the report.");
+                button.disabled = false;
+                return;
+            }
+
+            showProgress(job);
+            poll(job.status_url);
+        } catch (err) {
+            console.error("Report request error:", err);
+            alert("Network error. Please try again.");
+            button.disabled = false;
+        }
+    });
+});
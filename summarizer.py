@@ -1,7 +1,22 @@
 import os
 import re
+import json
+import hashlib
 from html import unescape
-from groq import Groq
+from groq_client import APIKeyError, chat_completion
+from extractive_summary import extractive_summary, compress_text
+
+FALLBACK_SUMMARY = "Meeting notes available."
+
+# Notes packed into one batch request, and the shared input budget they split
+BATCH_SIZE = 5
+BATCH_INPUT_CHARS = 8000
+
+# Length of the offline summary stored as Notulensi.excerpt
+EXCERPT_CHARS = 300
+
+# Block-level tags end a line, so headers don't run into the next paragraph
+BLOCK_TAGS = re.compile(r'<\s*(?:br|/p|/div|/li|/h[1-6]|/tr|/blockquote)\b[^>]*>', re.IGNORECASE)
 
 SUMMARIZER_PROMPT = """
 You are a meeting minutes summarizer for a school Islamic organization (Rohis).
@@ -23,35 +38,24 @@ Example output: "Discussed Ramadan program planning. Team will organize iftar ga
 """
 
 
-class APIKeyError(Exception):
-    """Raised when API key is missing or invalid"""
-    pass
+BATCH_SUMMARIZER_PROMPT = """
+You are a meeting minutes summarizer for a school Islamic organization (Rohis).
 
+You will receive several meeting minutes (notulensi). Each one starts with a
+line "### <number>". Summarize every one of them separately.
 
-def get_groq_client():
-    """
-    Get Groq client with proper error handling.
-    
-    Raises:
-        APIKeyError: If GROQ_API_KEY is not set in environment
-    """
-    api_key = os.environ.get("GROQ_API_KEY")
-    
-    if not api_key:
-        raise APIKeyError(
-            "GROQ_API_KEY environment variable is not set. "
-            "Please set it in your .env file or environment variables."
-        )
-    
-    if not api_key.strip():
-        raise APIKeyError(
-            "GROQ_API_KEY is empty. Please provide a valid API key."
-        )
-    
-    try:
-        return Groq(api_key=api_key)
-    except Exception as e:
-        raise APIKeyError(f"Failed to initialize Groq client: {str(e)}")
+Rules for each summary:
+- Maximum 2-3 sentences only
+- Focus on KEY decisions, actions, or topics discussed
+- Use simple, clear language
+- Do NOT add any commentary or opinions
+- Do NOT mix content from different notes
+- If a note is too short or unclear, its summary is: "Meeting notes available."
+
+Reply with ONE JSON object mapping each number (as a string) to its summary
+and nothing else, for example:
+{"1": "Discussed Ramadan program planning. Iftar gathering set for March 15th.", "2": "Meeting notes available."}
+"""
 
 
 def clean_html(content: str) -> str:
@@ -64,44 +68,90 @@ def clean_html(content: str) -> str:
     Returns:
         Clean text without HTML
     """
+    # Keep paragraph / line breaks as newlines
+    clean_text = BLOCK_TAGS.sub('\n', content)
     # Strip HTML tags
-    clean_text = re.sub('<[^<]+?>', '', content)
+    clean_text = re.sub('<[^<]+?>', '', clean_text)
     # Decode HTML entities
-    clean_text = unescape(clean_text).strip()
+    clean_text = unescape(clean_text)
+    clean_text = re.sub(r'[ \t\xa0]+', ' ', clean_text)
+    clean_text = re.sub(r'\s*\n\s*', '\n', clean_text).strip()
     return clean_text
 
 
-def summarize_notulensi(content: str) -> str:
+def local_summary(content: str, max_chars: int = EXCERPT_CHARS) -> str:
+    """
+    Offline summary of notulensi HTML: the two best ranked sentences,
+    picked by TextRank with no network call. Used while the Groq summary
+    is pending or when it isn't available at all.
+
+    Args:
+        content: HTML content from notulensi
+        max_chars: Length cap
+
+    Returns:
+        Summary string (FALLBACK_SUMMARY if the note is empty)
+    """
+    if not content or not content.strip():
+        return FALLBACK_SUMMARY
+    return text_excerpt(clean_html(content), max_chars=max_chars)
+
+
+def text_excerpt(clean_text: str, max_chars: int = EXCERPT_CHARS) -> str:
+    """local_summary for text that is already clean (e.g. Notulensi.plain_text)"""
+    excerpt = extractive_summary(clean_text, max_sentences=2, max_chars=max_chars) or clean_text or FALLBACK_SUMMARY
+    # hard cap, Notulensi.excerpt is a String(EXCERPT_CHARS)
+    return excerpt[:max_chars]
+
+
+def plain_text_fields(content: str) -> tuple:
+    """
+    Derived columns stored next to notulensi HTML, so pages can show them
+    without stripping tags on every render.
+
+    Args:
+        content: HTML content from notulensi
+
+    Returns:
+        (plain_text, excerpt)
+    """
+    if not content or not content.strip():
+        return '', FALLBACK_SUMMARY
+    clean_text = clean_html(content)
+    return clean_text, text_excerpt(clean_text)
+
+
+def _note_text(content: str, plain_text: str = None) -> str:
+    """Stored Notulensi.plain_text when there is one, else strip the HTML now"""
+    return plain_text if plain_text is not None else clean_html(content)
+
+
+def summarize_notulensi(content: str, plain_text: str = None) -> str:
     """
     Summarize notulensi content into 2-3 sentences using AI.
     
     Args:
         content: HTML content from notulensi
+        plain_text: Notulensi.plain_text of the same content, saves re-parsing
         
     Returns:
         Brief summary string (2-3 sentences)
     """
     if not content or not content.strip():
-        return "Meeting notes available."
+        return FALLBACK_SUMMARY
     
     try:
-        # Clean HTML from content
-        clean_text = clean_html(content)
+        clean_text = _note_text(content, plain_text)
         
         # If content is too short after cleaning, return default
         if len(clean_text) < 50:
-            return "Meeting notes available."
+            return FALLBACK_SUMMARY
         
-        # Truncate if too long (to save tokens and costs)
-        if len(clean_text) > 2000:
-            clean_text = clean_text[:2000] + "..."
-        
-        # Get Groq client
-        client = get_groq_client()
+        # Long notes: keep the most informative sentences (saves tokens and costs)
+        clean_text = compress_text(clean_text, max_chars=2000)
         
         # Generate summary
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
+        summary = chat_completion(
             messages=[
                 {"role": "system", "content": SUMMARIZER_PROMPT},
                 {"role": "user", "content": clean_text}
@@ -110,34 +160,137 @@ def summarize_notulensi(content: str) -> str:
             max_tokens=150,
         )
         
-        summary = completion.choices[0].message.content.strip()
-        
         # Validate summary length (should be reasonable)
         if len(summary) < 10 or len(summary) > 500:
             print(f"Warning: Summary length unusual ({len(summary)} chars)")
-            return "Meeting notes available."
+            return FALLBACK_SUMMARY
             
         return summary
     
     except APIKeyError as e:
         # API key not configured
         print(f"API Key Error in summarizer: {e}")
-        return "Meeting notes available."
+        return FALLBACK_SUMMARY
     
     except Exception as e:
         # Any other error
         print(f"Summarization error: {type(e).__name__}: {e}")
-        return "Meeting notes available."
+        return FALLBACK_SUMMARY
+
+
+def _valid_summary(summary) -> bool:
+    return isinstance(summary, str) and 10 <= len(summary.strip()) <= 500
+
+
+def _parse_batch_reply(reply: str) -> dict:
+    """
+    Pull the {"1": "...", ...} object out of a batch reply, tolerating code
+    fences or chatter around it.
+
+    Returns:
+        {position (int): summary}, empty if nothing parseable came back
+    """
+    start, end = reply.find('{'), reply.rfind('}')
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(reply[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    parsed = {}
+    for key, value in data.items():
+        try:
+            position = int(str(key).strip().lstrip('#').strip())
+        except ValueError:
+            continue
+        if _valid_summary(value):
+            parsed[position] = value.strip()
+    return parsed
+
+
+def summarize_notulensi_batch(contents: list, plain_texts: list = None) -> list:
+    """
+    Summarize several notulensi with one Groq request instead of one each
+    (the instructions are sent once, not per note). Notes missing from the
+    reply or with an unusable summary are retried one by one with
+    summarize_notulensi.
+
+    Args:
+        contents: HTML contents, at most BATCH_SIZE is sensible
+        plain_texts: Matching Notulensi.plain_text values (None entries are
+            cleaned from the HTML)
+
+    Returns:
+        One summary per content, in the same order (FALLBACK_SUMMARY where
+        nothing usable came back)
+    """
+    summaries = [FALLBACK_SUMMARY] * len(contents)
+    plain_texts = plain_texts or [None] * len(contents)
+
+    # only notes with something to summarize go in the request
+    pending = {}
+    for i, content in enumerate(contents):
+        if content and content.strip():
+            clean_text = _note_text(content, plain_texts[i])
+            if len(clean_text) >= 50:
+                pending[i] = clean_text
+
+    if len(pending) == 1:
+        (i,) = pending
+        summaries[i] = summarize_notulensi(contents[i], pending[i])
+        return summaries
+    if not pending:
+        return summaries
+
+    per_note = min(2000, BATCH_INPUT_CHARS // len(pending))
+    documents = "\n\n".join(
+        f"### {position}\n{compress_text(pending[i], max_chars=per_note)}"
+        for position, i in enumerate(pending, start=1)
+    )
+
+    try:
+        reply = chat_completion(
+            messages=[
+                {"role": "system", "content": BATCH_SUMMARIZER_PROMPT},
+                {"role": "user", "content": documents}
+            ],
+            temperature=0.3,
+            # ~150 tokens per summary plus the JSON around them
+            max_tokens=150 * len(pending) + 50,
+        )
+    except APIKeyError as e:
+        print(f"API Key Error in summarizer: {e}")
+        return summaries
+    except Exception as e:
+        # Groq down or circuit open: single calls would fail the same way
+        print(f"Batch summarization error: {type(e).__name__}: {e}")
+        return summaries
+
+    parsed = _parse_batch_reply(reply)
+    if not parsed:
+        print(f"Warning: batch summary reply not parseable ({len(reply)} chars)")
+
+    for position, i in enumerate(pending, start=1):
+        if position in parsed:
+            summaries[i] = parsed[position]
+        else:
+            summaries[i] = summarize_notulensi(contents[i], pending[i])
+    return summaries
 
 
-def get_summary_cache_key(notulensi_id: int) -> str:
+def get_summary_cache_key(notulensi_id: int, content: str) -> str:
     """
     Generate cache key for notulensi summary.
     
     Args:
         notulensi_id: ID of the notulensi record
+        content: Current HTML content, so every revision gets its own key
         
     Returns:
         Cache key string
     """
-    return f"notulensi_summary_{notulensi_id}"
\ No newline at end of file
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    return f"notulensi_summary_{notulensi_id}_{content_hash}"
\ No newline at end of file
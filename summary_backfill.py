@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Backfill AI summaries for every notulensi
+
+Finds notes whose stored summary is missing or belongs to an older revision
+and summarizes them BATCH_SIZE at a time (one Groq request per batch), with
+a bounded number of batches in flight. Safe to re-run: notes that are
+already up to date are skipped.
+
+    GROQ_API_KEY=... python summary_backfill.py [--workers 2] [--batch 5] [--limit N] [--dry-run]
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app import app
+from models import db, Notulensi
+from summarizer import clean_html, summarize_notulensi_batch, get_summary_cache_key, FALLBACK_SUMMARY, BATCH_SIZE
+
+SCAN_BATCH = 200
+
+
+def stale_note_ids(limit=None) -> list:
+    """Ids of notes without a summary for their current content, oldest first"""
+    rows = (
+        db.session.query(Notulensi.id, Notulensi.content, Notulensi.plain_text,
+                         Notulensi.summary, Notulensi.summary_key)
+        .order_by(Notulensi.id)
+        .yield_per(SCAN_BATCH)
+    )
+    note_ids = []
+    for note_id, content, plain_text, summary, summary_key in rows:
+        if summary and summary_key == get_summary_cache_key(note_id, content):
+            continue
+        # too short to summarize, the news feed shows it as-is
+        if plain_text is None:
+            plain_text = clean_html(content or '')
+        if len(plain_text) < 50:
+            continue
+        note_ids.append(note_id)
+        if limit and len(note_ids) >= limit:
+            break
+    return note_ids
+
+
+def summarize_batch(note_ids) -> tuple:
+    """
+    Summarize one batch of notes and store the results.
+
+    Returns:
+        (summarized, failed) counts
+    """
+    with app.app_context():
+        notes = Notulensi.query.filter(Notulensi.id.in_(note_ids)).order_by(Notulensi.id).all()
+        keys = [get_summary_cache_key(note.id, note.content) for note in notes]
+        summaries = summarize_notulensi_batch(
+            [note.content for note in notes],
+            [note.plain_text for note in notes]
+        )
+
+        summarized = failed = 0
+        for note, key, summary in zip(notes, keys, summaries):
+            if summary == FALLBACK_SUMMARY:
+                failed += 1
+                continue
+            note.summary = summary
+            note.summary_key = key
+            summarized += 1
+        db.session.commit()
+        return summarized, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize every notulensi that lacks a current summary")
+    parser.add_argument("--workers", type=int, default=2, help="batches sent to Groq at the same time")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="notes per Groq request")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many notes")
+    parser.add_argument("--dry-run", action="store_true", help="only count the notes that need a summary")
+    args = parser.parse_args()
+
+    with app.app_context():
+        note_ids = stale_note_ids(args.limit)
+
+    print(f"{len(note_ids)} notulensi need a summary")
+    if args.dry_run or not note_ids:
+        return 0
+
+    batches = [note_ids[i:i + args.batch] for i in range(0, len(note_ids), args.batch)]
+    started = time.monotonic()
+    summarized = failed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="backfill") as executor:
+        futures = {executor.submit(summarize_batch, batch): batch for batch in batches}
+        for done, future in enumerate(as_completed(futures), start=1):
+            batch = futures[future]
+            try:
+                ok, bad = future.result()
+            except Exception as e:
+                print(f"Batch {batch[0]}-{batch[-1]} error: {type(e).__name__}: {e}")
+                ok, bad = 0, len(batch)
+            summarized += ok
+            failed += bad
+            print(f"[{done}/{len(batches)}] summarized {summarized}, failed {failed}")
+
+    print(f"Done in {time.monotonic() - started:.1f}s: {summarized} summarized, {failed} failed")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
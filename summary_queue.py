@@ -0,0 +1,208 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from models import db, Notulensi, SummaryJob
+from summarizer import summarize_notulensi_batch, get_summary_cache_key, FALLBACK_SUMMARY, BATCH_SIZE
+
+# Groq calls are slow but light, a couple of threads per worker is plenty
+MAX_WORKERS = 2
+
+# A job still "running" after this long belongs to a worker that died
+STALE_AFTER = timedelta(minutes=10)
+
+# Failed revisions are retried up to MAX_ATTEMPTS times, waiting
+# RETRY_AFTER, then twice as long after each further failure
+MAX_ATTEMPTS = 3
+RETRY_AFTER = timedelta(minutes=5)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="summary")
+_app = None
+_resumed = False
+_resume_lock = threading.Lock()
+
+
+def init_app(app):
+    """
+    Attach the queue to the Flask app. Jobs left over from a previous run
+    are picked up on the first request, so scripts and migrations that
+    import the app don't start working the queue.
+    """
+    global _app
+    _app = app
+
+    @app.before_request
+    def _resume_once():
+        global _resumed
+        if _resumed:
+            return
+        with _resume_lock:
+            if _resumed:
+                return
+            _resumed = True
+        _executor.submit(_resume_pending)
+
+
+def _retry_due(job, now) -> bool:
+    """A failed job may run again once its backoff has passed"""
+    if job.attempts >= MAX_ATTEMPTS:
+        return False
+    wait = RETRY_AFTER * (2 ** max(0, job.attempts - 1))
+    return job.updated_at is None or job.updated_at <= now - wait
+
+
+def enqueue_summary(note) -> bool:
+    """
+    Queue a background summary for the current revision of a notulensi.
+    Does nothing if a job for this exact revision is already pending or
+    running, or failed too recently / too often.
+
+    Args:
+        note: Notulensi instance (already committed)
+
+    Returns:
+        True if a new job was queued
+    """
+    return enqueue_summaries([note]) == 1
+
+
+def enqueue_summaries(notes) -> int:
+    """
+    Queue summaries for several notulensi at once. New jobs are grouped
+    BATCH_SIZE to a worker task, so they share one Groq request.
+
+    Args:
+        notes: Notulensi instances (already committed)
+
+    Returns:
+        Number of new jobs queued
+    """
+    if not os.environ.get("GROQ_API_KEY"):
+        return 0
+
+    now = datetime.utcnow()
+    jobs = []
+    for note in notes:
+        cache_key = get_summary_cache_key(note.id, note.content)
+        if note.summary and note.summary_key == cache_key:
+            continue
+        if any(job.cache_key == cache_key for job in jobs):
+            continue
+
+        existing = (
+            SummaryJob.query.filter_by(cache_key=cache_key)
+            .order_by(SummaryJob.id.desc())
+            .first()
+        )
+        if existing is None:
+            job = SummaryJob(notulensi_id=note.id, cache_key=cache_key)
+            db.session.add(job)
+            jobs.append(job)
+        elif existing.status == 'failed' and _retry_due(existing, now):
+            existing.status = 'pending'
+            existing.error = None
+            jobs.append(existing)
+        elif existing.status == 'done':
+            # summary was cleared since (e.g. content edited back), redo it
+            existing.status = 'pending'
+            existing.attempts = 0
+            jobs.append(existing)
+        # pending / running: already on its way
+
+    if not jobs:
+        return 0
+    db.session.commit()
+
+    _submit_batches([job.id for job in jobs])
+    return len(jobs)
+
+
+def _submit_batches(job_ids):
+    for i in range(0, len(job_ids), BATCH_SIZE):
+        _executor.submit(_run_batch, job_ids[i:i + BATCH_SIZE])
+
+
+def _resume_pending():
+    try:
+        with _app.app_context():
+            cutoff = datetime.utcnow() - STALE_AFTER
+            SummaryJob.query.filter(
+                SummaryJob.status == 'running',
+                SummaryJob.updated_at < cutoff
+            ).update({"status": "pending"}, synchronize_session=False)
+            db.session.commit()
+
+            # failures from the last run get their retry too
+            now = datetime.utcnow()
+            for job in SummaryJob.query.filter_by(status='failed').filter(SummaryJob.attempts < MAX_ATTEMPTS):
+                if _retry_due(job, now):
+                    job.status = 'pending'
+                    job.error = None
+            db.session.commit()
+
+            job_ids = [
+                job_id for (job_id,) in
+                db.session.query(SummaryJob.id).filter_by(status='pending').order_by(SummaryJob.id).all()
+            ]
+        _submit_batches(job_ids)
+    except Exception as e:
+        # e.g. table not created yet while running migrations
+        print(f"Summary queue resume skipped: {type(e).__name__}: {e}")
+
+
+def _claim(job_id) -> bool:
+    """Mark a pending job as running, only one worker process can win"""
+    claimed = SummaryJob.query.filter_by(id=job_id, status='pending').update({
+        "status": "running",
+        "attempts": SummaryJob.attempts + 1,
+        "updated_at": datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def _run_batch(job_ids):
+    with _app.app_context():
+        claimed = []
+        try:
+            claimed = [job_id for job_id in job_ids if _claim(job_id)]
+            if not claimed:
+                return
+
+            jobs = SummaryJob.query.filter(SummaryJob.id.in_(claimed)).order_by(SummaryJob.id).all()
+            notes = {
+                note.id: note for note in
+                Notulensi.query.filter(Notulensi.id.in_([job.notulensi_id for job in jobs]))
+            }
+
+            live = []
+            for job in jobs:
+                note = notes.get(job.notulensi_id)
+                # note edited again since this job was queued, a newer job handles it
+                if not note or get_summary_cache_key(note.id, note.content) != job.cache_key:
+                    job.status = 'done'
+                else:
+                    live.append((job, note))
+
+            summaries = summarize_notulensi_batch(
+                [note.content for _, note in live],
+                [note.plain_text for _, note in live]
+            ) if live else []
+            for (job, note), summary in zip(live, summaries):
+                if summary == FALLBACK_SUMMARY:
+                    job.status = 'failed'
+                    job.error = "No usable summary returned"
+                else:
+                    note.summary = summary
+                    note.summary_key = job.cache_key
+                    job.status = 'done'
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Summary jobs {claimed} error: {type(e).__name__}: {e}")
+            SummaryJob.query.filter(SummaryJob.id.in_(claimed)).update({
+                "status": "failed",
+                "error": str(e)
+            }, synchronize_session=False)
+            db.session.commit()
@@ -0,0 +1,231 @@
+import csv
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from docx import Document
+from openpyxl import Workbook
+from models import db, Attendance, Session, User
+from attendance_stats import ATTENDANCE_STATUSES
+from session_ranges import sessions_between
+
+REPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'zip': 'application/zip',
+}
+
+FETCH_BATCH = 1000
+
+
+class TermMatrix:
+    """
+    Every member x every session in a date range.
+
+    Attributes:
+        sessions: Sessions in date order
+        members: Users with role 'member', by name
+        marks: {(session_id, user_id): status}
+    """
+
+    def __init__(self, sessions, members, marks):
+        self.sessions = sessions
+        self.members = members
+        self.marks = marks
+
+    def member_counts(self, user_id) -> dict:
+        counts = dict.fromkeys(ATTENDANCE_STATUSES, 0)
+        for session in self.sessions:
+            status = self.marks.get((session.id, user_id))
+            if status in counts:
+                counts[status] += 1
+        return counts
+
+    def session_counts(self, session_id) -> dict:
+        counts = dict.fromkeys(ATTENDANCE_STATUSES, 0)
+        for member in self.members:
+            status = self.marks.get((session_id, member.id))
+            if status in counts:
+                counts[status] += 1
+        return counts
+
+    def attendance_rate(self, user_id) -> float:
+        """Share of sessions attended (present or late), 0-100"""
+        if not self.sessions:
+            return 0.0
+        counts = self.member_counts(user_id)
+        return round(100 * (counts['present'] + counts['late']) / len(self.sessions), 1)
+
+
+def load_term_matrix(start, end) -> TermMatrix:
+    """
+    Load the attendance matrix for start <= session date < end.
+    All marks in the range come back in a single joined query, no
+    per-session lookups.
+    """
+    sessions = sessions_between(start, end).all()
+    members = User.query.filter(User.role == 'member').order_by(User.name, User.id).all()
+
+    rows = (
+        db.session.query(Attendance.session_id, Attendance.user_id, Attendance.status)
+        .join(Session, Attendance.session_id == Session.id)
+        .filter(Session.date >= start, Session.date < end)
+        .yield_per(FETCH_BATCH)
+    )
+    marks = {(session_id, user_id): status for session_id, user_id, status in rows}
+    return TermMatrix(sessions, members, marks)
+
+
+def _session_label(session) -> str:
+    return f"{session.date.isoformat() if session.date else '-'} {session.name or ''}".strip()
+
+
+def write_matrix_xlsx(matrix: TermMatrix, title: str, output, progress=None):
+    """
+    Write the matrix as a write-only workbook: one row per member with a
+    column per session, and a per-session summary sheet.
+    """
+    workbook = Workbook(write_only=True)
+
+    sheet = workbook.create_sheet(title="Attendance")
+    sheet.append([title])
+    sheet.append(
+        ['Name', 'Class', *[_session_label(s) for s in matrix.sessions],
+         *[status.capitalize() for status in ATTENDANCE_STATUSES], 'Attendance %']
+    )
+    total = len(matrix.members) or 1
+    for i, member in enumerate(matrix.members):
+        counts = matrix.member_counts(member.id)
+        sheet.append([
+            member.name,
+            member.class_name or '',
+            *[(matrix.marks.get((s.id, member.id)) or '').capitalize() for s in matrix.sessions],
+            *[counts[status] for status in ATTENDANCE_STATUSES],
+            matrix.attendance_rate(member.id),
+        ])
+        if progress:
+            progress((i + 1) / total)
+
+    summary = workbook.create_sheet(title="Sessions")
+    summary.append(['Date', 'Session', *[status.capitalize() for status in ATTENDANCE_STATUSES], 'Not marked'])
+    for session in matrix.sessions:
+        counts = matrix.session_counts(session.id)
+        summary.append([
+            session.date.isoformat() if session.date else '',
+            session.name,
+            *[counts[status] for status in ATTENDANCE_STATUSES],
+            len(matrix.members) - sum(counts.values()),
+        ])
+
+    workbook.save(output)
+
+
+def write_summary_docx(matrix: TermMatrix, title: str, output, progress=None):
+    """
+    Printable summary: per-session and per-member status counts. The full
+    matrix is too wide for a page, it lives in the XLSX.
+    """
+    doc = Document()
+    doc.add_heading(title, 0)
+    doc.add_paragraph(f'Sessions: {len(matrix.sessions)}')
+    doc.add_paragraph(f'Members: {len(matrix.members)}')
+
+    doc.add_heading('Sessions', level=1)
+    table = doc.add_table(rows=1, cols=2 + len(ATTENDANCE_STATUSES))
+    table.style = 'Light Grid Accent 1'
+    for cell, label in zip(table.rows[0].cells, ['Date', 'Session', *[s.capitalize() for s in ATTENDANCE_STATUSES]]):
+        cell.text = label
+    for session in matrix.sessions:
+        counts = matrix.session_counts(session.id)
+        cells = table.add_row().cells
+        cells[0].text = session.date.isoformat() if session.date else ''
+        cells[1].text = session.name or ''
+        for cell, status in zip(cells[2:], ATTENDANCE_STATUSES):
+            cell.text = str(counts[status])
+
+    doc.add_heading('Members', level=1)
+    table = doc.add_table(rows=1, cols=3 + len(ATTENDANCE_STATUSES))
+    table.style = 'Light Grid Accent 1'
+    for cell, label in zip(table.rows[0].cells, ['Name', 'Class', *[s.capitalize() for s in ATTENDANCE_STATUSES], 'Attendance %']):
+        cell.text = label
+    total = len(matrix.members) or 1
+    for i, member in enumerate(matrix.members):
+        counts = matrix.member_counts(member.id)
+        cells = table.add_row().cells
+        cells[0].text = member.name
+        cells[1].text = member.class_name or ''
+        for cell, status in zip(cells[2:], ATTENDANCE_STATUSES):
+            cell.text = str(counts[status])
+        cells[-1].text = f"{matrix.attendance_rate(member.id)}"
+        if progress:
+            progress((i + 1) / total)
+
+    doc.save(output)
+
+
+def write_report_zip(matrix: TermMatrix, title: str, output, progress=None):
+    """XLSX + DOCX + one CSV per session in a single archive"""
+    def stage(offset, share):
+        return (lambda done: progress(offset + share * done)) if progress else None
+
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with tempfile.TemporaryFile() as xlsx:
+            write_matrix_xlsx(matrix, title, xlsx, stage(0.0, 0.5))
+            xlsx.seek(0)
+            with archive.open('attendance.xlsx', 'w') as entry:
+                while chunk := xlsx.read(64 * 1024):
+                    entry.write(chunk)
+
+        docx = BytesIO()
+        write_summary_docx(matrix, title, docx, stage(0.5, 0.4))
+        archive.writestr('summary.docx', docx.getvalue())
+
+        total = len(matrix.sessions) or 1
+        for i, session in enumerate(matrix.sessions):
+            buffer = StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(['Name', 'Class', 'Status'])
+            for member in matrix.members:
+                writer.writerow([member.name, member.class_name or '',
+                                 (matrix.marks.get((session.id, member.id)) or '').capitalize()])
+            name = f"sessions/{_session_label(session).replace('/', '-').replace(' ', '_')}_{session.id}.csv"
+            archive.writestr(name, buffer.getvalue())
+            if progress:
+                progress(0.9 + 0.1 * (i + 1) / total)
+
+
+WRITERS = {
+    'xlsx': write_matrix_xlsx,
+    'docx': write_summary_docx,
+    'zip': write_report_zip,
+}
+
+
+def build_term_report(start, end, fmt: str, title: str, progress=None) -> bytes:
+    """
+    Build a whole-term report.
+
+    Args:
+        start: First day included
+        end: First day excluded
+        fmt: 'xlsx', 'docx' or 'zip'
+        title: Heading / first row of the report
+        progress: Optional callback taking a 0-1 float
+
+    Returns:
+        Report file bytes
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown report format: {fmt}")
+
+    matrix = load_term_matrix(start, end)
+    # detach the loaded rows and end the read transaction, so progress
+    # commits neither expire them (one reload per row) nor wait on our lock
+    db.session.expunge_all()
+    db.session.commit()
+    if progress:
+        progress(0.0)
+
+    with tempfile.TemporaryFile() as output:
+        WRITERS[fmt](matrix, title, output, progress)
+        output.seek(0)
+        return output.read()